@@ -7,9 +7,19 @@ import os
 import sys
 import json
 import duckdb
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 from datetime import datetime
 import uuid
+import shutil
+import tempfile
+from urllib.parse import quote
+
+try:
+    import adbc_driver_postgresql.dbapi as adbc_postgresql
+except ImportError:
+    adbc_postgresql = None
 
 # Import metadata extractors
 sys.path.append(os.path.join(os.path.dirname(__file__), 'metadata'))
@@ -17,6 +27,18 @@ from sqlserver_metadata import SqlServerMetadataExtractor
 from postgresql_metadata import PostgreSQLMetadataExtractor
 from oracle_metadata import OracleMetadataExtractor
 
+# export_logs statements, executed with bound parameters
+LOG_INSERT_SQL = "INSERT INTO export_logs VALUES {rows}"
+LOG_ROW_PLACEHOLDER = "(?, ?, ?, ?, ?, ?, ?, ?, ?)"
+LOG_UPDATE_SQL = """
+    UPDATE export_logs
+    SET status = ?, message = ?, finished_at = ?, s3_path = COALESCE(?, s3_path)
+    WHERE id = ?
+"""
+
+# Primary key types eligible for ranged (split) exports
+INTEGER_TYPES = {'tinyint', 'smallint', 'int', 'integer', 'bigint', 'int2', 'int4', 'int8'}
+
 
 class DuckDBExporter:
     def __init__(self, config: dict):
@@ -29,38 +51,123 @@ class DuckDBExporter:
         self.username = config.get('username')
         self.password = config.get('password')
         self.s3_bucket_path = config['s3_bucket_path'].rstrip('/')
+        # Each run writes every table below a prefix of its own, so files left by an earlier export
+        # (or a different file layout) are never read together with this run's files
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         self.s3_access_key = config.get('s3_access_key')
         self.s3_secret_key = config.get('s3_secret_key')
         self.s3_session_token = config.get('s3_session_token')
         self.s3_region = config.get('s3_region', 'us-east-1')
         self.aws_profile = config.get('aws_profile')
+        self.parallel_tables = config.get('parallel_tables', 8)
+        # Concurrent catalog queries (one source connection each) for the metadata extractors
+        self.metadata_workers = config.get('metadata_workers', 4)
+        # Optional directory (or true for ~/.cache/sql_maintenance) for caching source metadata
+        # between runs, keyed by a schema fingerprint
+        self.metadata_cache_dir = config.get('metadata_cache_dir')
+        # Oracle/PostgreSQL table DDL from DBMS_METADATA / pg_dump instead of reconstructing it from columns
+        self.metadata_native_ddl = config.get('metadata_native_ddl', True)
+        # Skip table DDL generation entirely (Oracle/PostgreSQL) when only data and catalog metadata are wanted
+        self.metadata_include_ddl = config.get('metadata_include_ddl', True)
+        self.export_batch_size = max(1, config.get('export_batch_size', 16))
+        self.parquet_file_size = config.get('parquet_file_size', '256MB')
+        # Parquet codec for exported files; SNAPPY keeps the encoder off the critical path,
+        # archival runs trade write throughput for the smaller ZSTD output
+        if config.get('archival_mode'):
+            self.parquet_compression = 'ZSTD'
+        else:
+            self.parquet_compression = str(config.get('parquet_compression', 'SNAPPY')).upper()
+        # Optional {full_name: column} map of tables to write as hive partitions on a low-cardinality column
+        self.partition_by = config.get('partition_by') or {}
+        # DuckDB threads are shared by all concurrent table exports, so they also bound the number of
+        # in-flight S3 requests; capped to avoid socket/DNS exhaustion on large hosts
+        self.duckdb_threads = config.get('duckdb_threads') or min(64, os.cpu_count() or 1)
+        self.s3_uploader_thread_limit = config.get('s3_uploader_thread_limit', 32)
+        # Split tables with a single integer primary key into this many key ranges (1 disables);
+        # only when the key range spans at least ranged_export_min_rows values
+        self.ranged_export_parts = config.get('ranged_export_parts', 1)
+        self.ranged_export_min_rows = config.get('ranged_export_min_rows', 10_000_000)
+        # Optionally read PostgreSQL tables through ADBC (requires adbc-driver-postgresql and pyarrow)
+        self.postgres_adbc = bool(config.get('postgres_adbc')) and self.db_type == 'postgresql'
+        if self.postgres_adbc and adbc_postgresql is None:
+            print("Warning: postgres_adbc requested but adbc-driver-postgresql is not installed; using postgres_query")
+            self.postgres_adbc = False
+        # File-backed staging database so large scans can spill to disk instead of running out of memory
+        self.duckdb_staging_path = config.get(
+            'duckdb_staging_path',
+            os.path.join(tempfile.gettempdir(), f'export_stage_{os.getpid()}.duckdb')
+        )
+        # Spill directory; the default is private to this run (next to its staging database) and removed with it,
+        # so concurrent runs never share or clean up each other's spill files
+        self._owns_temp_directory = 'duckdb_temp_directory' not in config
+        self.duckdb_temp_directory = config.get('duckdb_temp_directory', f"{self.duckdb_staging_path}.tmp")
+        self.duckdb_memory_limit = config.get('duckdb_memory_limit')
+        self.duckdb_max_temp_size = config.get('duckdb_max_temp_directory_size')
+        self.duckdb_extension_directory = config.get('duckdb_extension_directory')
 
         self.metadata_extractor = None
         self.duckdb_conn = None
+        # export_logs rows not yet written to DuckDB, keyed by log id; guarded by _log_lock
+        # since the table worker threads share it
+        self._log_buffer = {}
+        self._log_flush_rows = config.get('log_flush_rows', 1000)
+        self._log_lock = threading.Lock()
 
     def initialize_duckdb(self):
         """Initialize DuckDB connection with S3 configuration"""
         print("Initializing DuckDB with S3 support...")
 
-        self.duckdb_conn = duckdb.connect(':memory:')
+        print(f"Using DuckDB staging database: {self.duckdb_staging_path}")
+        self._remove_staging_database()  # never resume from a stale staging file
+        self.duckdb_conn = duckdb.connect(self.duckdb_staging_path)
+
+        # Spill settings (memory_limit and max_temp_directory_size keep DuckDB's defaults unless configured)
+        temp_directory_escaped = self.duckdb_temp_directory.replace("'", "''")
+        self.duckdb_conn.execute(f"SET temp_directory = '{temp_directory_escaped}';")
+        if self.duckdb_memory_limit:
+            self.duckdb_conn.execute(f"SET memory_limit = '{self.duckdb_memory_limit}';")
+        if self.duckdb_max_temp_size:
+            self.duckdb_conn.execute(f"SET max_temp_directory_size = '{self.duckdb_max_temp_size}';")
+
+        # Keep installed extensions in a pinned directory so later runs (e.g. in containers) reuse them
+        if self.duckdb_extension_directory:
+            extension_directory_escaped = self.duckdb_extension_directory.replace("'", "''")
+            self.duckdb_conn.execute(f"SET extension_directory = '{extension_directory_escaped}';")
 
         # Install and load required extensions
-        self.duckdb_conn.execute("INSTALL httpfs;")
-        self.duckdb_conn.execute("LOAD httpfs;")
+        self._load_extension('httpfs')
+
+        # Tune httpfs for long-running, bandwidth-bound S3 uploads
+        self.duckdb_conn.execute(f"SET threads = {int(self.duckdb_threads)};")
+        self.duckdb_conn.execute("SET http_keep_alive = true;")
+        self.duckdb_conn.execute("SET http_retries = 5;")
+        self.duckdb_conn.execute("SET http_timeout = 60;")  # seconds
+        # httpfs has no per-connection cap; limit its global multipart upload threads instead
+        self.duckdb_conn.execute(f"SET s3_uploader_thread_limit = {int(self.s3_uploader_thread_limit)};")
+
+        # Let COPY flush row groups as they are produced instead of buffering to keep scan order.
+        # The sort order is pushed down into the source query, so DuckDB sees no ORDER BY; exports of
+        # sorted tables switch insertion order back on for their own session (see _insertion_order_sql)
+        self.duckdb_conn.execute("SET preserve_insertion_order = false;")
+
+        # No interactive progress bar for a batch export (avoids per-chunk progress bookkeeping)
+        self.duckdb_conn.execute("SET enable_progress_bar = false;")
 
         # Install database-specific scanner extension
         if self.db_type == 'sqlserver':
-            print("Installing nanodbc extension for SQL Server...")
-            self.duckdb_conn.execute("INSTALL nanodbc FROM community;")
-            self.duckdb_conn.execute("LOAD nanodbc;")
+            print("Loading nanodbc extension for SQL Server...")
+            self._load_extension('nanodbc', 'community')
         elif self.db_type == 'postgresql':
-            print("Installing PostgreSQL scanner extension...")
-            self.duckdb_conn.execute("INSTALL postgres;")
-            self.duckdb_conn.execute("LOAD postgres;")
+            print("Loading PostgreSQL scanner extension...")
+            self._load_extension('postgres')
+
+            # Attach the source once so every export can push its query down with postgres_query
+            pg_conn = f"host={self.server} port={self.port} dbname={self.database} user={self.username} password={self.password}"
+            pg_conn_escaped = pg_conn.replace("'", "''")
+            self.duckdb_conn.execute(f"ATTACH '{pg_conn_escaped}' AS pgsrc (TYPE postgres, READ_ONLY);")
         elif self.db_type == 'oracle':
-            print("Installing nanodbc extension for Oracle...")
-            self.duckdb_conn.execute("INSTALL nanodbc FROM community;")
-            self.duckdb_conn.execute("LOAD nanodbc;")
+            print("Loading nanodbc extension for Oracle...")
+            self._load_extension('nanodbc', 'community')
 
         # Configure S3 access using DuckDB secrets
         if self.aws_profile:
@@ -101,9 +208,20 @@ class DuckDBExporter:
             """)
 
         print("DuckDB initialized successfully")
-        # Initialize in-memory export progress tracking table
+        # Initialize export progress tracking table
         self._init_progress_table()
 
+    def _load_extension(self, name: str, repository: str = None):
+        """Load a DuckDB extension, installing it first only if it is not already in the extension directory"""
+        installed = self.duckdb_conn.execute(
+            "SELECT installed FROM duckdb_extensions() WHERE extension_name = ? OR list_contains(aliases, ?)",
+            [name, name]
+        ).fetchone()
+        if not (installed and installed[0]):
+            print(f"Installing DuckDB extension: {name}")
+            self.duckdb_conn.execute(f"INSTALL {name}" + (f" FROM {repository};" if repository else ";"))
+        self.duckdb_conn.execute(f"LOAD {name};")
+
     def connect_to_source(self):
         """Connect to source database and initialize metadata extractor"""
         print(f"Connecting to {self.db_type} database: {self.database}@{self.server}...")
@@ -115,7 +233,9 @@ class DuckDBExporter:
                 auth_type=self.auth_type,
                 username=self.username,
                 password=self.password,
-                port=self.port
+                port=self.port,
+                max_workers=self.metadata_workers,
+                cache_dir=self.metadata_cache_dir
             )
         elif self.db_type == 'postgresql':
             self.metadata_extractor = PostgreSQLMetadataExtractor(
@@ -123,7 +243,11 @@ class DuckDBExporter:
                 database=self.database,
                 username=self.username,
                 password=self.password,
-                port=self.port
+                port=self.port,
+                max_workers=self.metadata_workers,
+                cache_dir=self.metadata_cache_dir,
+                native_ddl=self.metadata_native_ddl,
+                include_ddl=self.metadata_include_ddl
             )
         elif self.db_type == 'oracle':
             self.metadata_extractor = OracleMetadataExtractor(
@@ -131,7 +255,11 @@ class DuckDBExporter:
                 database=self.database,
                 username=self.username,
                 password=self.password,
-                port=self.port
+                port=self.port,
+                max_workers=self.metadata_workers,
+                cache_dir=self.metadata_cache_dir,
+                native_ddl=self.metadata_native_ddl,
+                include_ddl=self.metadata_include_ddl
             )
         else:
             raise ValueError(f"Unsupported database type: {self.db_type}")
@@ -149,48 +277,46 @@ class DuckDBExporter:
         metadata_path = f"{self.s3_bucket_path}/metadata"
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        # Save complete metadata JSON
-        metadata_json = json.dumps(metadata, indent=2, default=str)
-        metadata_file = f"{metadata_path}/metadata_{timestamp}.json"
-
-        print(f"Saving metadata to: {metadata_file}")
-        self._save_to_s3(metadata_file, metadata_json)
+        # Save metadata JSON: a small summary document plus one JSON Lines file per object section
+        self._save_metadata_to_s3(metadata_path, timestamp, metadata)
 
-        # Save individual DDL files for tables
+        # Save all table/view/procedure DDL as a single parquet file (one row per object)
+        ddl_rows = []
         for table in metadata['tables']:
-            ddl_file = f"{metadata_path}/tables/{table['schema']}/{table['name']}.sql"
-            print(f"Saving DDL: {ddl_file}")
-            self._save_to_s3(ddl_file, table['ddl'])
+            if table['ddl'] is None:
+                continue
+            ddl_rows.append(('tables', table['schema'], table['name'], f"tables/{table['schema']}/{table['name']}.sql", table['ddl']))
 
-        # Save view definitions
         for view in metadata.get('views', []):
-            view_file = f"{metadata_path}/views/{view['schema']}/{view['name']}.sql"
-            print(f"Saving view: {view_file}")
-            self._save_to_s3(view_file, view['definition'])
+            ddl_rows.append(('views', view['schema'], view['name'], f"views/{view['schema']}/{view['name']}.sql", view['definition']))
 
-        # Save procedures/functions
         for proc in metadata.get('stored_procedures', []) + metadata.get('procedures', []) + metadata.get('functions', []):
-            proc_file = f"{metadata_path}/procedures/{proc['schema']}/{proc['name']}.sql"
-            print(f"Saving procedure/function: {proc_file}")
-            self._save_to_s3(proc_file, proc['definition'])
+            ddl_rows.append(('procedures', proc['schema'], proc['name'], f"procedures/{proc['schema']}/{proc['name']}.sql", proc['definition']))
+
+        ddl_file = f"{metadata_path}/ddl_{timestamp}.parquet"
+        print(f"Saving {len(ddl_rows)} DDL definitions to: {ddl_file}")
+        self._save_ddl_to_s3(ddl_file, ddl_rows)
+
+        # Resolve each table's sort order once, up front, rather than in the export worker threads
+        for table in metadata['tables']:
+            table['_sort_order'] = self.get_table_sort_order(table)
 
         print(f"Metadata extraction completed. {len(metadata['tables'])} tables processed.")
         return metadata
 
     def _save_to_s3(self, s3_path: str, content: str):
         """Save content to S3 using DuckDB"""
-        # Escape single quotes in content
-        content_escaped = content.replace("'", "''")
-
-        # Use DuckDB to write to S3
+        # Content is bound as a parameter; only the (derived) path is a SQL literal.
+        # Quoting/escaping are disabled so the file holds the content verbatim rather than a CSV field
+        s3_path_escaped = s3_path.replace("'", "''")
         query = f"""
-        COPY (SELECT '{content_escaped}' AS content)
-        TO '{s3_path}'
-        (FORMAT 'csv', HEADER false);
+        COPY (SELECT ?::VARCHAR AS content)
+        TO '{s3_path_escaped}'
+        (FORMAT 'csv', HEADER false, QUOTE '', ESCAPE '');
         """
 
         try:
-            self.duckdb_conn.execute(query)
+            self.duckdb_conn.execute(query, [content])
         except Exception as e:
             print(f"Warning: Failed to save to S3: {s3_path}. Error: {e}")
             # Fallback: save locally
@@ -200,8 +326,87 @@ class DuckDBExporter:
                 f.write(content)
             print(f"Saved locally instead: {local_path}")
 
+    def _copy_to_s3(self, relation: str, s3_path: str, options: str):
+        """COPY a DuckDB relation to S3, falling back to the same path under local_export/"""
+        def copy_sql(path: str) -> str:
+            path_escaped = path.replace("'", "''")
+            return f"COPY {relation} TO '{path_escaped}' ({options});"
+
+        try:
+            self.duckdb_conn.execute(copy_sql(s3_path))
+        except Exception as e:
+            print(f"Warning: Failed to save to S3: {s3_path}. Error: {e}")
+            # Fallback: save locally
+            local_path = s3_path.replace('s3://', 'local_export/')
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            self.duckdb_conn.execute(copy_sql(local_path))
+            print(f"Saved locally instead: {local_path}")
+
+    def _save_metadata_to_s3(self, metadata_path: str, timestamp: str, metadata: dict):
+        """
+        Save metadata without serializing it as one JSON document: scalar fields go to
+        metadata_<timestamp>.json, and each list section (tables, views, ...) to
+        <section>_<timestamp>.jsonl with one object per line, written by DuckDB's JSON writer
+        """
+        sections = {key: value for key, value in metadata.items() if isinstance(value, list)}
+        summary = {key: value for key, value in metadata.items() if key not in sections}
+        summary['sections'] = {key: f"{key}_{timestamp}.jsonl" for key in sections}
+
+        metadata_file = f"{metadata_path}/metadata_{timestamp}.json"
+        print(f"Saving metadata to: {metadata_file}")
+        self._save_to_s3(metadata_file, json.dumps(summary, indent=2, default=str))
+
+        for section, objects in sections.items():
+            section_file = f"{metadata_path}/{section}_{timestamp}.jsonl"
+            print(f"Saving {len(objects)} {section} to: {section_file}")
+
+            # Objects are serialized one at a time into a local newline-delimited file (json.dumps
+            # escapes embedded newlines), recording the union of their keys in first-seen order
+            with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8', delete=False) as f:
+                local_file = f.name
+                keys = {}
+                for obj in objects:
+                    keys.update(dict.fromkeys(obj))
+                    f.write(json.dumps(obj, default=str))
+                    f.write('\n')
+
+            try:
+                if keys:
+                    # Every field is read as raw JSON, so values are written back exactly as serialized
+                    # (no type inference turning 1 into 1.0 or large integers into doubles)
+                    escaped_keys = [key.replace("'", "''") for key in keys]
+                    columns = ', '.join(f"'{key}': 'JSON'" for key in escaped_keys)
+                    local_file_escaped = local_file.replace("'", "''")
+                    relation = (
+                        f"(FROM read_json('{local_file_escaped}', format = 'newline_delimited', "
+                        f"columns = {{{columns}}}))"
+                    )
+                else:
+                    relation = "(SELECT NULL LIMIT 0)"
+                self._copy_to_s3(relation, section_file, "FORMAT json")
+            finally:
+                os.remove(local_file)
+
+    def _save_ddl_to_s3(self, s3_path: str, ddl_rows: list):
+        """Save (kind, schema, name, path, content) DDL rows to S3 as one parquet file using DuckDB"""
+        self.duckdb_conn.execute("""
+            CREATE OR REPLACE TEMP TABLE metadata_ddl (
+                kind VARCHAR,
+                schema VARCHAR,
+                name VARCHAR,
+                path VARCHAR,
+                content VARCHAR
+            );
+        """)
+        try:
+            if ddl_rows:
+                self.duckdb_conn.executemany("INSERT INTO metadata_ddl VALUES (?, ?, ?, ?, ?)", ddl_rows)
+            self._copy_to_s3("metadata_ddl", s3_path, f"FORMAT 'parquet', COMPRESSION '{self.parquet_compression}'")
+        finally:
+            self.duckdb_conn.execute("DROP TABLE IF EXISTS metadata_ddl;")
+
     def _init_progress_table(self):
-        """Create an in-memory table to track export progress"""
+        """Create a table in the staging database to track export progress"""
         self.duckdb_conn.execute("""
             CREATE TABLE IF NOT EXISTS export_logs (
                 id VARCHAR,
@@ -216,39 +421,68 @@ class DuckDBExporter:
             );
         """)
 
-    def _log_export_start(self, table_info: dict, s3_path: str) -> str:
-        """Insert a row marking the start of an export and return the log id"""
+    def _log_success_sql(self, log_id: str) -> str:
+        """
+        Build the UPDATE marking an export as successful, for use inside a
+        multi-statement script (which cannot bind parameters). Only the
+        generated log id is inlined; the message is derived from the stored s3_path.
+        """
+        return f"""
+            UPDATE export_logs
+            SET status = 'success', message = 'Exported to ' || s3_path, finished_at = timezone('UTC', now())
+            WHERE id = '{log_id}';
+        """
+
+    def _log_export_start(self, table_info: dict, s3_path: str, conn=None) -> str:
+        """Buffer a row marking the start of an export and return the log id"""
         log_id = str(uuid.uuid4())
-        started_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-        schema_escaped = table_info['schema'].replace("'", "''")
-        table_escaped = table_info['name'].replace("'", "''")
-        full_name_escaped = table_info['full_name'].replace("'", "''")
-        s3_path_escaped = s3_path.replace("'", "''")
-        self.duckdb_conn.execute(f"""
-            INSERT INTO export_logs (id, schema, table_name, full_name, s3_path, status, message, started_at)
-            VALUES ('{log_id}', '{schema_escaped}', '{table_escaped}', '{full_name_escaped}', '{s3_path_escaped}', 'in_progress', '', '{started_at}');
-        """)
+        with self._log_lock:
+            self._log_buffer[log_id] = [
+                log_id, table_info['schema'], table_info['name'], table_info['full_name'], s3_path,
+                'in_progress', '', datetime.utcnow(), None
+            ]
+            buffer_full = len(self._log_buffer) >= self._log_flush_rows
+        if buffer_full:
+            self._flush_logs(conn)
         return log_id
 
-    def _log_export_end(self, log_id: str, status: str, message: str = ''):
-        """Update the log row with final status and message"""
-        finished_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-        message_escaped = (message or '').replace("'", "''")
-        self.duckdb_conn.execute(f"""
-            UPDATE export_logs
-            SET status = '{status}', message = '{message_escaped}', finished_at = '{finished_at}'
-            WHERE id = '{log_id}';
-        """)
+    def _log_export_end(self, log_id: str, status: str, message: str = '', conn=None, s3_path: str = None):
+        """Record the final status and message of an export (and its path, if it moved since the start row)"""
+        finished_at = datetime.utcnow()
+        with self._log_lock:
+            row = self._log_buffer.get(log_id)
+            if row is not None:
+                row[5], row[6], row[8] = status, message or '', finished_at
+                row[4] = s3_path or row[4]
+                return
+
+            # The start row has already been flushed to export_logs
+            conn = conn or self.duckdb_conn
+            conn.execute(LOG_UPDATE_SQL, [status, message or '', finished_at, s3_path, log_id])
+
+    def _flush_logs(self, conn=None):
+        """Write buffered export_logs rows to DuckDB with multi-row INSERTs"""
+        conn = conn or self.duckdb_conn
+        with self._log_lock:
+            rows = list(self._log_buffer.values())
+            self._log_buffer.clear()
+            for i in range(0, len(rows), self._log_flush_rows):
+                chunk = rows[i:i + self._log_flush_rows]
+                conn.execute(
+                    LOG_INSERT_SQL.format(rows=', '.join([LOG_ROW_PLACEHOLDER] * len(chunk))),
+                    [value for row in chunk for value in row]
+                )
 
     def _write_progress_to_s3(self):
         """Write the export_logs table to S3 with a timestamped filename (parquet)"""
+        self._flush_logs()
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         s3_logs_path = f"{self.s3_bucket_path}/logs/export_log_{timestamp}.parquet"
         try:
             self.duckdb_conn.execute(f"""
                 COPY (SELECT * FROM export_logs)
                 TO '{s3_logs_path}'
-                (FORMAT 'parquet', COMPRESSION 'ZSTD');
+                (FORMAT 'parquet', COMPRESSION '{self.parquet_compression}');
             """)
             print(f"Export progress log written to: {s3_logs_path}")
         except Exception as e:
@@ -257,17 +491,15 @@ class DuckDBExporter:
             local_path = s3_logs_path.replace('s3://', 'local_export/')
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
             try:
-                res = self.duckdb_conn.execute("SELECT * FROM export_logs").fetchall()
-                with open(local_path.replace('.parquet', '.csv'), 'w', encoding='utf-8') as f:
-                    f.write('id,schema,table_name,full_name,s3_path,status,message,started_at,finished_at\n')
-                    for row in res:
-                        f.write(','.join([str(col).replace(',', ' ') if col is not None else '' for col in row]) + '\n')
-                print(f"Progress log saved locally instead: {local_path.replace('.parquet','.csv')}")
+                local_csv_path = local_path.replace('.parquet', '.csv')
+                local_csv_escaped = local_csv_path.replace("'", "''")
+                self.duckdb_conn.execute(f"COPY export_logs TO '{local_csv_escaped}' (FORMAT 'csv', HEADER true);")
+                print(f"Progress log saved locally instead: {local_csv_path}")
             except Exception as e2:
                 print(f"Failed to save progress log locally: {e2}")
 
     def get_table_sort_order(self, table_info: dict) -> str:
-        """Determine the optimal sort order for a table based on indexes"""
+        """Determine the sort order for a table from its primary key or clustered index ("" if none)"""
         schema = table_info['schema']
         table = table_info['name']
 
@@ -284,144 +516,432 @@ class DuckDBExporter:
                 print(f"Using clustered index for sort order: {', '.join(idx_cols)}")
                 return ', '.join([f'"{col}"' for col in idx_cols])
 
-        # Check for any unique index
-        for index in table_info.get('indexes', []):
-            if index.get('is_unique'):
-                idx_cols = index['columns']
-                print(f"Using unique index for sort order: {', '.join(idx_cols)}")
-                return ', '.join([f'"{col}"' for col in idx_cols])
-
-        # Default: sort by first column
-        if table_info.get('columns'):
-            first_col = table_info['columns'][0]['name']
-            print(f"Using first column for sort order: {first_col}")
-            return f'"{first_col}"'
-
+        # No clustered key: skip sorting entirely so the source can stream the table unsorted
         return ""
 
-    def export_table_data(self, table_info: dict):
-        """Export a single table's data to S3 as parquet using DuckDB scanner"""
+    def _scan_function(self, table_info: dict, select_list: str = '*', where: str = None, order_by: str = None) -> str:
+        """Build the DuckDB table function that runs a query for this table on the source database"""
         schema = table_info['schema']
         table = table_info['name']
-        full_name = table_info['full_name']
 
-        print(f"\nExporting table: {full_name}")
+        # Use DuckDB scanner to read and export data
+        if self.db_type == 'sqlserver' or self.db_type == 'oracle':
+            # Build ODBC connection string for nanodbc
+            if self.db_type == 'sqlserver':
+                if self.auth_type == 'windows':
+                    odbc_conn = f"Driver={{ODBC Driver 17 for SQL Server}};Server={self.server},{self.port};Database={self.database};Trusted_Connection=yes;"
+                else:
+                    odbc_conn = f"Driver={{ODBC Driver 17 for SQL Server}};Server={self.server},{self.port};Database={self.database};Uid={self.username};Pwd={self.password};"
+            elif self.db_type == 'oracle':
+                odbc_conn = f"Driver={{Oracle in OraClient19Home1}};DBQ={self.server}:{self.port}/{self.database};Uid={self.username};Pwd={self.password};"
+
+            # Use odbc_query from nanodbc extension
+            # Query the specific table
+            table_query = f"SELECT {select_list} FROM [{schema}].[{table}]" if self.db_type == 'sqlserver' else f'SELECT {select_list} FROM "{schema}"."{table}"'
+
+            if where:
+                table_query += f" WHERE {where}"
+            if order_by:
+                table_query += f" ORDER BY {order_by}"
+
+            # Escape single quotes in connection string and query for DuckDB SQL literal
+            odbc_conn_escaped = odbc_conn.replace("'", "''")
+            table_query_escaped = table_query.replace("'", "''")
+
+            # Use named parameters (connection=..., query=...) so the function is formatted like:
+            # odbc_query(
+            #   connection='Driver=...;',
+            #   query='SELECT * FROM dbo.Table'
+            # )
+            return f"""
+                odbc_query(
+                    connection='{odbc_conn_escaped}',
+                    query='{table_query_escaped}'
+                )
+            """
 
-        # Determine sort order
-        sort_order = self.get_table_sort_order(table_info)
+        elif self.db_type == 'postgresql':
+            # PostgreSQL uses the native postgres extension (not ODBC) through the database
+            # attached as pgsrc. A plain read of the whole table scans the attached table, which
+            # DuckDB splits into parallel ctid ranges; postgres_query runs anything else (ORDER BY,
+            # key ranges, MIN/MAX bounds) server-side as a single stream
+            if select_list == '*' and not where and not order_by:
+                schema_escaped = schema.replace('"', '""')
+                table_escaped = table.replace('"', '""')
+                return f'pgsrc."{schema_escaped}"."{table_escaped}"'
+
+            table_query = f'SELECT {select_list} FROM "{schema}"."{table}"'
+
+            if where:
+                table_query += f" WHERE {where}"
+            if order_by:
+                table_query += f" ORDER BY {order_by}"
+
+            table_query_escaped = table_query.replace("'", "''")
+            return f"""
+                postgres_query('pgsrc', '{table_query_escaped}')
+            """
 
-        # S3 path for this table's parquet files
-        table_s3_path = f"{self.s3_bucket_path}/{schema}/{table}/{table}.parquet"
+        else:
+            raise ValueError(f"Scanner not available for {self.db_type}")
+
+    def _sort_order(self, table_info: dict) -> str:
+        """Sort order for a table, as resolved during metadata extraction"""
+        sort_order = table_info.get('_sort_order')
+        if sort_order is None:
+            sort_order = self.get_table_sort_order(table_info)
+        return sort_order
+
+    def _insertion_order_sql(self, ordered: bool) -> str:
+        """SET statement keeping (ordered) or relaxing row order for the COPY that follows it on the same cursor"""
+        return f"SET SESSION preserve_insertion_order = {'true' if ordered else 'false'};"
+
+    def _table_s3_path(self, table_info: dict, attempt: int = 1) -> str:
+        """
+        S3 prefix for one export attempt of a table (DuckDB writes data_N.parquet or part_NNNN files below it).
+        The prefix is new for every run and every retry, so a failed or earlier attempt's files never mix with these
+        """
+        run = self.run_id if attempt == 1 else f"{self.run_id}_{attempt}"
+        return f"{self.s3_bucket_path}/{table_info['schema']}/{table_info['name']}/{run}"
+
+    def _build_export_query(self, table_info: dict, source: str = None, attempt: int = 1) -> tuple:
+        """
+        Build the COPY statement for a table. Returns (s3_path, export_query)
+        source overrides the relation to copy from (defaults to a scan of the source table)
+        """
+        table_s3_path = self._table_s3_path(table_info, attempt)
+
+        if source is None:
+            source = self._scan_function(table_info, order_by=self._sort_order(table_info))
+
+        # Split output into bounded-size files, or into hive partitions when a column is configured
+        # (DuckDB cannot combine FILE_SIZE_BYTES with PARTITION_BY). The prefix is unique to this
+        # attempt, so OVERWRITE_OR_IGNORE only lets DuckDB write into a directory it did not create
+        copy_options = (
+            f"FORMAT 'parquet', COMPRESSION '{self.parquet_compression}', "
+            "ROW_GROUP_SIZE 100000, OVERWRITE_OR_IGNORE true"
+        )
+        partition_column = self.partition_by.get(table_info['full_name'])
+        if partition_column:
+            copy_options += f', PARTITION_BY ("{partition_column}")'
+        else:
+            copy_options += f", FILE_SIZE_BYTES '{self.parquet_file_size}'"
+
+        # Build the export query (sorting, if any, is already pushed down into the source query, so
+        # insertion order is preserved for sorted tables only; the setting is per table since batches
+        # share a cursor). FROM-first syntax hands the scan straight to the parquet writer without a
+        # SELECT * projection
+        table_s3_path_escaped = table_s3_path.replace("'", "''")
+        export_query = f"""
+            {self._insertion_order_sql(bool(self._sort_order(table_info)))}
+            COPY (
+                FROM {source}
+            ) TO '{table_s3_path_escaped}'
+            ({copy_options});
+        """
+
+        return table_s3_path, export_query
+
+    def export_table_data(self, table_info: dict, conn=None, attempt: int = 1):
+        """Export a single table's data to S3 as parquet using DuckDB scanner (attempt > 1 retries into a fresh prefix)"""
+        print(f"\nExporting table: {table_info['full_name']}")
 
         log_id = None
-        try:
-            print(f"Writing to: {table_s3_path}")
-            # Create progress log entry for this table
+        if self.postgres_adbc:
+            # The ADBC attempt and the postgres_query fallback share one export_logs row, so a
+            # recovered table is logged as a single success rather than a failure plus a success;
+            # the fallback writes to the next attempt's prefix, away from any partial ADBC output
+            log_id = self._try_log_export_start(table_info, self._table_s3_path(table_info, attempt), conn)
             try:
-                log_id = self._log_export_start(table_info, table_s3_path)
+                self._export_postgres_via_adbc(table_info, conn, log_id, attempt)
+                return
             except Exception as e:
-                print(f"Warning: could not create progress log entry: {e}")
-
-            # Use DuckDB scanner to read and export data
-            if self.db_type == 'sqlserver' or self.db_type == 'oracle':
-                # Build ODBC connection string for nanodbc
-                if self.db_type == 'sqlserver':
-                    if self.auth_type == 'windows':
-                        odbc_conn = f"Driver={{ODBC Driver 17 for SQL Server}};Server={self.server},{self.port};Database={self.database};Trusted_Connection=yes;"
-                    else:
-                        odbc_conn = f"Driver={{ODBC Driver 17 for SQL Server}};Server={self.server},{self.port};Database={self.database};Uid={self.username};Pwd={self.password};"
-                elif self.db_type == 'oracle':
-                    odbc_conn = f"Driver={{Oracle in OraClient19Home1}};DBQ={self.server}:{self.port}/{self.database};Uid={self.username};Pwd={self.password};"
-
-                # Use odbc_query from nanodbc extension
-                # Query the specific table
-                table_query = f"SELECT * FROM [{schema}].[{table}]" if self.db_type == 'sqlserver' else f'SELECT * FROM "{schema}"."{table}"'
-
-                if sort_order:
-                    table_query += f" ORDER BY {sort_order}"
-
-                # Escape single quotes in connection string and query for DuckDB SQL literal
-                odbc_conn_escaped = odbc_conn.replace("'", "''")
-                table_query_escaped = table_query.replace("'", "''")
-
-                # Use named parameters (connection=..., query=...) so the function is formatted like:
-                # odbc_query(
-                #   connection='Driver=...;',
-                #   query='SELECT * FROM dbo.Table'
-                # )
-                scan_function = f"""
-                    odbc_query(
-                        connection='{odbc_conn_escaped}',
-                        query='{table_query_escaped}'
-                    )
-                """
-
-            elif self.db_type == 'postgresql':
-                # PostgreSQL uses native postgres scanner (not ODBC)
-                pg_conn = f"host={self.server} port={self.port} dbname={self.database} user={self.username} password={self.password}"
-                pg_conn_escaped = pg_conn.replace("'", "''")
-                schema_escaped = schema.replace("'", "''")
-                table_escaped = table.replace("'", "''")
-                scan_function = f"""
-                    postgres_scan(
-                        '{pg_conn_escaped}',
-                        '{schema_escaped}',
-                        '{table_escaped}'
-                    )
-                """
+                print(f"Warning: ADBC export failed for {table_info['full_name']} ({e}); falling back to postgres_query")
+            attempt += 1
 
-            else:
-                raise ValueError(f"Scanner not available for {self.db_type}")
-
-            # Build the export query
-            # For SQL Server/Oracle via nanodbc, sorting is already in the query
-            # For PostgreSQL, we need to add ORDER BY here
-            if self.db_type == 'postgresql' and sort_order:
-                export_query = f"""
-                    COPY (
-                        SELECT * FROM {scan_function}
-                        ORDER BY {sort_order}
-                    ) TO '{table_s3_path}'
-                    (FORMAT 'parquet', COMPRESSION 'ZSTD', ROW_GROUP_SIZE 100000);
-                """
-            else:
-                export_query = f"""
-                    COPY (
-                        SELECT * FROM {scan_function}
-                    ) TO '{table_s3_path}'
-                    (FORMAT 'parquet', COMPRESSION 'ZSTD', ROW_GROUP_SIZE 100000);
-                """
+        table_s3_path, export_query = self._build_export_query(table_info, attempt=attempt)
+        self._run_export(table_info, table_s3_path, export_query, conn, log_id)
+
+    def _export_postgres_via_adbc(self, table_info: dict, conn=None, log_id: str = None, attempt: int = 1):
+        """
+        Export a PostgreSQL table by streaming Arrow record batches from the ADBC driver
+        (binary COPY protocol) into DuckDB's parquet writer
+        """
+        conn = conn or self.duckdb_conn
+        uri = (
+            f"postgresql://{quote(self.username or '', safe='')}:{quote(self.password or '', safe='')}"
+            f"@{self.server}:{self.port}/{quote(self.database, safe='')}"
+        )
+        table_query = f'SELECT * FROM "{table_info["schema"]}"."{table_info["name"]}"'
+        sort_order = self._sort_order(table_info)
+        if sort_order:
+            table_query += f" ORDER BY {sort_order}"
+
+        view_name = f"adbc_{uuid.uuid4().hex}"
+        with adbc_postgresql.connect(uri) as pg_conn:
+            with pg_conn.cursor() as pg_cursor:
+                pg_cursor.execute(table_query)
+                conn.register(view_name, pg_cursor.fetch_record_batch())
+                try:
+                    table_s3_path, export_query = self._build_export_query(table_info, source=view_name, attempt=attempt)
+                    self._run_export(table_info, table_s3_path, export_query, conn, log_id)
+                finally:
+                    conn.unregister(view_name)
+
+    def _try_log_export_start(self, table_info: dict, s3_path: str, conn=None) -> str:
+        """Create a progress log entry, returning None (with a warning) if it cannot be written"""
+        try:
+            return self._log_export_start(table_info, s3_path, conn)
+        except Exception as e:
+            print(f"Warning: could not create progress log entry: {e}")
+            return None
+
+    def _run_export(self, table_info: dict, s3_path: str, export_query: str, conn=None, log_id: str = None):
+        """Run an export COPY statement with progress logging (log_id continues an existing entry)"""
+        conn = conn or self.duckdb_conn
+        full_name = table_info['full_name']
+
+        try:
+            print(f"Writing to: {s3_path}")
+            # Create progress log entry for this table
+            if log_id is None:
+                log_id = self._try_log_export_start(table_info, s3_path, conn)
 
-            self.duckdb_conn.execute(export_query)
+            conn.execute(export_query)
 
-            print(f"✓ Table {full_name} exported successfully")
+            print(f"✓ Table {full_name} exported successfully to {s3_path}")
             try:
                 if log_id:
-                    self._log_export_end(log_id, 'success', f'Exported to {table_s3_path}')
+                    self._log_export_end(log_id, 'success', f'Exported to {s3_path}', conn, s3_path)
             except Exception:
                 pass
 
         except Exception as e:
             try:
                 if log_id:
-                    self._log_export_end(log_id, 'failed', str(e))
+                    self._log_export_end(log_id, 'failed', str(e), conn, s3_path)
             except Exception:
                 pass
             print(f"✗ Error exporting table {full_name}: {e}")
             raise
 
+    def _integer_pk_column(self, table_info: dict) -> str:
+        """Return the primary key column if the key is a single integer column, otherwise None"""
+        pk = table_info.get('primary_key')
+        if not pk or len(pk['columns']) != 1:
+            return None
+
+        pk_column = pk['columns'][0]
+        for col in table_info.get('columns', []):
+            if col['name'] != pk_column:
+                continue
+            # SQL Server reports type_name, PostgreSQL/Oracle report data_type
+            data_type = (col.get('type_name') or col.get('data_type') or '').lower()
+            if data_type in INTEGER_TYPES:
+                return pk_column
+            if data_type == 'number' and col.get('data_precision') and col.get('data_scale') == 0:
+                return pk_column
+        return None
+
+    def _export_ranged(self, table_info: dict) -> list:
+        """
+        Plan a ranged export for a table with a single integer primary key (runs in a worker thread).
+        Returns the (low, high) key ranges to export as separate parts, or an empty list after
+        exporting the table in one piece when its key range is too small to be worth splitting.
+        """
+        pk_column = self._integer_pk_column(table_info)
+        cursor = self.duckdb_conn.cursor()
+        try:
+            # Aliased so the bounds never come back as unnamed columns through odbc_query
+            bounds_select = f'MIN("{pk_column}") AS lo, MAX("{pk_column}") AS hi'
+            low, high = cursor.execute(f"FROM {self._scan_function(table_info, select_list=bounds_select)}").fetchone()
+            if low is None or int(high) - int(low) + 1 < self.ranged_export_min_rows:
+                self.export_table_data(table_info, cursor)
+                return []
+        finally:
+            cursor.close()
+
+        low, high = int(low), int(high)
+        step = -(-(high - low + 1) // self.ranged_export_parts)  # ceiling division
+        return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+
+    def _export_part(self, table_info: dict, part_no: int, low: int, high: int):
+        """Export one primary key range of a table as part_NNNN_N.parquet files on its own DuckDB cursor"""
+        pk_column = self._integer_pk_column(table_info)
+        table_s3_path = self._table_s3_path(table_info)
+        part_s3_path = f"{table_s3_path}/part_{part_no:04d}_*.parquet"
+        scan_function = self._scan_function(
+            table_info,
+            where=f'"{pk_column}" BETWEEN {low} AND {high}',
+            order_by=f'"{pk_column}"'
+        )
+        # All parts write into the table's prefix, each bounded by FILE_SIZE_BYTES and kept apart by its file name pattern
+        table_s3_path_escaped = table_s3_path.replace("'", "''")
+        export_query = f"""
+            {self._insertion_order_sql(True)}
+            COPY (
+                FROM {scan_function}
+            ) TO '{table_s3_path_escaped}'
+            (FORMAT 'parquet', COMPRESSION '{self.parquet_compression}', ROW_GROUP_SIZE 100000,
+             FILE_SIZE_BYTES '{self.parquet_file_size}', FILENAME_PATTERN 'part_{part_no:04d}_{{i}}', OVERWRITE_OR_IGNORE true);
+        """
+
+        print(f"\nExporting table: {table_info['full_name']} part {part_no} ({pk_column} {low}..{high})")
+        cursor = self.duckdb_conn.cursor()
+        try:
+            self._run_export(table_info, part_s3_path, export_query, cursor)
+        finally:
+            cursor.close()
+
+    def _export_batch(self, tables: list) -> list:
+        """
+        Export a batch of tables as one multi-statement script on its own DuckDB cursor
+        (runs in a worker thread). Returns a list of (table_info, error) pairs.
+        """
+        # Cursors share the catalog, secrets and loaded extensions of the parent connection
+        cursor = self.duckdb_conn.cursor()
+        try:
+            if self.postgres_adbc:
+                # ADBC streams each table through Python, so there is no script to batch
+                results = []
+                for table_info in tables:
+                    try:
+                        self.export_table_data(table_info, cursor)
+                        results.append((table_info, None))
+                    except Exception as e:
+                        results.append((table_info, e))
+                self._flush_logs(cursor)
+                return results
+
+            # Start rows for the whole batch are flushed in one INSERT;
+            # each COPY is followed by its success UPDATE so progress lands in the same round trip
+            statements = []
+            pending = {}
+            for table_info in tables:
+                table_s3_path, export_query = self._build_export_query(table_info)
+                log_id = self._log_export_start(table_info, table_s3_path, cursor)
+                pending[log_id] = table_info
+                statements.append(export_query)
+                statements.append(self._log_success_sql(log_id))
+
+            self._flush_logs(cursor)
+
+            print(f"\nExporting batch of {len(tables)} table(s): {', '.join(t['full_name'] for t in tables)}")
+            try:
+                cursor.execute("\n".join(statements))
+                return [(table_info, None) for table_info in tables]
+            except Exception as e:
+                print(f"Warning: batch export failed ({e}); retrying unfinished tables individually")
+
+            # Statements before the failure are already applied; find which tables still need exporting.
+            # The failed COPY may have left partial files, so the retries write to a fresh prefix
+            log_ids = list(pending)
+            done = {row[0] for row in cursor.execute(
+                "SELECT id FROM export_logs WHERE list_contains(?, id) AND status = 'success'", [log_ids]
+            ).fetchall()}
+            cursor.execute("DELETE FROM export_logs WHERE list_contains(?, id) AND status <> 'success'", [log_ids])
+
+            results = []
+            for log_id, table_info in pending.items():
+                if log_id in done:
+                    results.append((table_info, None))
+                    continue
+                try:
+                    self.export_table_data(table_info, cursor, attempt=2)
+                    results.append((table_info, None))
+                except Exception as e:
+                    results.append((table_info, e))
+            self._flush_logs(cursor)
+            return results
+        finally:
+            cursor.close()
+
+    def _batch_tables(self, tables: list) -> list:
+        """
+        Group tables by schema and split each group into batches of at most export_batch_size,
+        small enough that there are at least parallel_tables batches to keep every worker busy
+        """
+        batch_size = max(1, min(self.export_batch_size, len(tables) // max(1, self.parallel_tables)))
+        batches = []
+        by_schema = {}
+        for table in tables:
+            by_schema.setdefault(table['schema'], []).append(table)
+        for schema_tables in by_schema.values():
+            for i in range(0, len(schema_tables), batch_size):
+                batches.append(schema_tables[i:i + batch_size])
+        return batches
+
     def export_all_tables(self, metadata: dict):
         """Export all tables to S3"""
         print(f"\nStarting data export for {len(metadata['tables'])} tables...")
 
         total_tables = len(metadata['tables'])
-        for idx, table in enumerate(metadata['tables'], 1):
-            print(f"\n[{idx}/{total_tables}] Processing {table['full_name']}")
-            try:
-                self.export_table_data(table)
-            except Exception as e:
-                print(f"Failed to export {table['full_name']}: {e}")
-                # Continue with next table
+
+        # Large tables with a single integer primary key are split into key ranges exported concurrently;
+        # everything else is exported in batches
+        ranged = []
+        batched = []
+        for table in metadata['tables']:
+            if (self.ranged_export_parts > 1 and table['full_name'] not in self.partition_by
+                    and self._integer_pk_column(table)):
+                ranged.append(table)
+            else:
+                batched.append(table)
+        batches = self._batch_tables(batched)
+
+        max_workers = max(1, min(self.parallel_tables, len(batches) + len(ranged) * self.ranged_export_parts))
+        print(f"Exporting {len(batches)} batch(es) and {len(ranged)} ranged table(s) with {max_workers} parallel worker(s)")
+
+        completed = 0
+
+        def report(table, error):
+            nonlocal completed
+            completed += 1
+            if error is None:
+                print(f"[{completed}/{total_tables}] Finished {table['full_name']}")
+            else:
+                print(f"[{completed}/{total_tables}] Failed to export {table['full_name']}: {error}")
+                # Continue with remaining tables
+
+        # full_name -> [parts still running, first part error]
+        part_progress = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._export_batch, batch): ('batch', batch) for batch in batches}
+            futures.update({executor.submit(self._export_ranged, table): ('ranged', table) for table in ranged})
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, payload = futures.pop(future)
+                    if kind == 'batch':
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            results = [(table, e) for table in payload]
+                        for table, error in results:
+                            report(table, error)
+
+                    elif kind == 'ranged':
+                        try:
+                            ranges = future.result()
+                        except Exception as e:
+                            report(payload, e)
+                            continue
+                        if not ranges:
+                            report(payload, None)
+                            continue
+                        part_progress[payload['full_name']] = [len(ranges), None]
+                        for part_no, (low, high) in enumerate(ranges, 1):
+                            futures[executor.submit(self._export_part, payload, part_no, low, high)] = ('part', payload)
+
+                    else:
+                        progress = part_progress[payload['full_name']]
+                        try:
+                            future.result()
+                        except Exception as e:
+                            progress[1] = progress[1] or e
+                        progress[0] -= 1
+                        if progress[0] == 0:
+                            report(payload, progress[1])
 
         try:
             self._write_progress_to_s3()
@@ -470,6 +990,22 @@ class DuckDBExporter:
                 self.metadata_extractor.close()
             if self.duckdb_conn:
                 self.duckdb_conn.close()
+            self._remove_staging_database()
+
+    def _remove_staging_database(self):
+        """Delete the staging database file, its WAL and (unless configured) the spill directory"""
+        for path in (self.duckdb_staging_path, f"{self.duckdb_staging_path}.wal"):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                print(f"Warning: could not remove staging file {path}: {e}")
+        if self._owns_temp_directory:
+            try:
+                if os.path.exists(self.duckdb_temp_directory):
+                    shutil.rmtree(self.duckdb_temp_directory)
+            except OSError as e:
+                print(f"Warning: could not remove temp directory {self.duckdb_temp_directory}: {e}")
 
 
 def main():
@@ -0,0 +1,59 @@
+"""
+On-disk cache for extracted metadata
+Entries are gzipped pickles named by a hash of the source identity (including the login, since
+catalog visibility depends on it) and a schema fingerprint, so any DDL change in the source yields
+a new key and the stale entry is simply never read again.
+Entries are unpickled, so the cache directory is created private (0700), files are written 0600,
+and files that another user owns or could have modified are ignored
+"""
+
+import gzip
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'sql_maintenance')
+
+
+def cache_path(cache_dir: str, *key_parts: Any) -> str:
+    """Build the cache file path for a (source, fingerprint) key; a non-path cache_dir (e.g. True) uses the default"""
+    key = hashlib.sha256('\x1f'.join(str(part) for part in key_parts).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir if isinstance(cache_dir, str) else DEFAULT_CACHE_DIR, f'{key}.pkl.gz')
+
+
+def _is_private(path: str) -> bool:
+    """True if the file belongs to the current user and is not writable by anyone else (always true where uids don't exist)"""
+    if not hasattr(os, 'getuid'):
+        return True
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def load(path: str) -> Optional[Dict[str, Any]]:
+    """Load cached metadata, or None if there is no usable entry"""
+    try:
+        if not _is_private(path):
+            print(f"Warning: Ignoring metadata cache {path}: not owned by this user or writable by others")
+            return None
+        with gzip.open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable metadata cache {path}: {e}")
+        return None
+
+
+def store(path: str, metadata: Dict[str, Any]):
+    """Write metadata to the cache (atomically, so concurrent runs never read a partial file)"""
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+        # GzipFile does not close a file object it is handed, so both are closed before os.replace
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            pickle.dump(metadata, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Warning: Failed to write metadata cache {path}: {e}")
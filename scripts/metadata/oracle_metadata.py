@@ -5,83 +5,172 @@ Uses ODBC connection via cx_Oracle
 """
 
 import cx_Oracle
-from typing import Dict, List, Any
+from collections import defaultdict
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import queue
+from typing import Dict, List, Any, Tuple
 import json
 
+import metadata_cache
+
+# Keys of a column dict, in the order the column queries select them
+COLUMN_FIELDS = (
+    'name', 'data_type', 'data_length', 'data_precision', 'data_scale', 'nullable', 'data_default', 'ordinal_position'
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _qi(name: str) -> str:
+    """Quote an identifier for DDL (cached: schema and common column names repeat across tables)"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _lob_as_string(cursor, name, default_type, size, precision, scale):
+    """Output type handler fetching CLOB/NCLOB columns inline as strings (no LOB round-trip per value)"""
+    # DB_TYPE_LONG fetches NCLOB as str too; cx_Oracle 8 has no national LONG type
+    if default_type in (cx_Oracle.DB_TYPE_CLOB, cx_Oracle.DB_TYPE_NCLOB):
+        return cursor.var(cx_Oracle.DB_TYPE_LONG, arraysize=cursor.arraysize)
+
+
+def _fmt_length(col: Dict[str, Any]) -> str:
+    """VARCHAR2(n), CHAR(n), ..."""
+    if col['data_length']:
+        return f"{col['data_type']}({col['data_length']})"
+    return col['data_type']
+
+
+def _fmt_number(col: Dict[str, Any]) -> str:
+    """NUMBER(p), NUMBER(p,s)"""
+    if not col['data_precision']:
+        return col['data_type']
+    if col['data_scale'] and col['data_scale'] > 0:
+        return f"{col['data_type']}({col['data_precision']},{col['data_scale']})"
+    return f"{col['data_type']}({col['data_precision']})"
+
+
+def _fmt_plain(col: Dict[str, Any]) -> str:
+    """Types written without modifiers"""
+    return col['data_type']
+
+
+# data_type -> function rendering the column's type in CREATE TABLE DDL
+TYPE_FORMATTERS = {
+    'VARCHAR2': _fmt_length,
+    'CHAR': _fmt_length,
+    'NVARCHAR2': _fmt_length,
+    'NCHAR': _fmt_length,
+    'NUMBER': _fmt_number,
+}
+
 
 class OracleMetadataExtractor:
-    def __init__(self, server: str, database: str, username: str, password: str, port: int = 1521):
+    def __init__(self, server: str, database: str, username: str, password: str, port: int = 1521,
+                 max_workers: int = 4, cache_dir: str = None, native_ddl: bool = True,
+                 include_ddl: bool = True):
         self.server = server
         self.database = database  # Service name or SID
         self.username = username
         self.password = password
         self.port = port
+        self.max_workers = max(1, max_workers)
+        # Directory for the on-disk metadata cache; None disables caching
+        self.cache_dir = cache_dir
+        # Take table DDL from DBMS_METADATA rather than reconstructing it from the columns
+        self.native_ddl = native_ddl
+        # Generate table DDL during extraction; when off, 'ddl' is None and callers that need it
+        # can render it on demand with get_table_ddl(schema, table, table['columns'])
+        self.include_ddl = include_ddl
         self.connection = None
+        # Connections handed to metadata worker threads; the main connection is one of them
+        self._pool = None
+        self._pool_connections = []
 
-    def connect(self):
-        """Establish connection to Oracle"""
+    def _open_connection(self):
+        """Open a new connection to Oracle"""
         dsn = cx_Oracle.makedsn(self.server, self.port, service_name=self.database)
-        self.connection = cx_Oracle.connect(user=self.username, password=self.password, dsn=dsn)
+        connection = cx_Oracle.connect(user=self.username, password=self.password, dsn=dsn)
+        connection.outputtypehandler = _lob_as_string
+        return connection
+
+    def connect(self):
+        """Establish connection to Oracle, plus worker connections for concurrent metadata queries"""
+        self.connection = self._open_connection()
+        self._pool = queue.Queue()
+        self._pool_connections = [self.connection] + [self._open_connection() for _ in range(self.max_workers - 1)]
+        for connection in self._pool_connections:
+            self._pool.put(connection)
         return self.connection
 
     def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        for connection in self._pool_connections:
+            if connection is not self.connection:
+                connection.close()
+        self._pool_connections = []
         if self.connection:
             self.connection.close()
 
+    def _run_pooled(self, method_name: str, *args):
+        """Run an extractor method on a connection taken from the pool (connections are not shared across threads)"""
+        connection = self._pool.get()
+        try:
+            worker = copy.copy(self)
+            worker.connection = connection
+            return getattr(worker, method_name)(*args)
+        finally:
+            self._pool.put(connection)
+
+    def _cursor(self):
+        """Open a cursor that fetches in large batches (the driver defaults cost a round-trip per 100 rows)"""
+        cursor = self.connection.cursor()
+        cursor.arraysize = 1000
+        cursor.prefetchrows = 1001
+        return cursor
+
     def get_tables_list(self) -> List[Dict[str, str]]:
         """Get list of all tables owned by the user"""
         query = """
         SELECT
             owner,
-            table_name
+            table_name,
+            owner || '.' || table_name AS full_name
         FROM all_tables
         WHERE owner = UPPER(:owner)
         ORDER BY owner, table_name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query, {'owner': self.username})
 
         tables = []
-        for row in cursor.fetchall():
+        for row in cursor:
             tables.append({
                 'schema': row[0],
                 'table': row[1],
-                'full_name': f'{row[0]}.{row[1]}'
+                'full_name': row[2]
             })
 
         cursor.close()
         return tables
 
-    def get_table_ddl(self, schema: str, table: str) -> str:
-        """Generate CREATE TABLE DDL for a specific table"""
+    def get_table_ddl(self, schema: str, table: str, columns: List[Dict[str, Any]] = None) -> str:
+        """Generate CREATE TABLE DDL for a specific table (columns are fetched if not supplied)"""
         ddl_parts = []
         ddl_parts.append(f"-- Table: {schema}.{table}")
-        ddl_parts.append(f'CREATE TABLE "{schema}"."{table}" (')
+        ddl_parts.append(f'CREATE TABLE {_qi(schema)}.{_qi(table)} (')
 
         # Get columns
-        columns = self._get_columns(schema, table)
+        if columns is None:
+            columns = self._get_columns(schema, table)
         column_defs = []
 
         for col in columns:
-            col_def = f'    "{col["name"]}" {col["data_type"]}'
-
-            if col['data_type'] in ('VARCHAR2', 'CHAR', 'NVARCHAR2', 'NCHAR') and col['data_length']:
-                col_def = f'    "{col["name"]}" {col["data_type"]}({col["data_length"]})'
-            elif col['data_type'] in ('NUMBER',) and col['data_precision']:
-                if col['data_scale'] and col['data_scale'] > 0:
-                    col_def = f'    "{col["name"]}" {col["data_type"]}({col["data_precision"]},{col["data_scale"]})'
-                else:
-                    col_def = f'    "{col["name"]}" {col["data_type"]}({col["data_precision"]})'
-
-            if col['nullable'] == 'N':
-                col_def += " NOT NULL"
-
-            if col['data_default']:
-                col_def += f" DEFAULT {col['data_default'].strip()}"
-
-            column_defs.append(col_def)
+            type_text = TYPE_FORMATTERS.get(col['data_type'], _fmt_plain)(col)
+            not_null = " NOT NULL" if col['nullable'] == 'N' else ""
+            default = f" DEFAULT {col['data_default'].strip()}" if col['data_default'] else ""
+            column_defs.append(f'    {_qi(col["name"])} {type_text}{not_null}{default}')
 
         ddl_parts.append(",\n".join(column_defs))
         ddl_parts.append(");")
@@ -106,21 +195,12 @@ class OracleMetadataExtractor:
         ORDER BY column_id
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query, {'owner': schema, 'table_name': table})
 
         columns = []
-        for row in cursor.fetchall():
-            columns.append({
-                'name': row[0],
-                'data_type': row[1],
-                'data_length': row[2],
-                'data_precision': row[3],
-                'data_scale': row[4],
-                'nullable': row[5],
-                'data_default': row[6],
-                'ordinal_position': row[7]
-            })
+        for row in cursor:
+            columns.append(dict(zip(COLUMN_FIELDS, row)))
 
         cursor.close()
         return columns
@@ -140,7 +220,7 @@ class OracleMetadataExtractor:
         GROUP BY c.constraint_name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query, {'owner': schema, 'table_name': table})
         row = cursor.fetchone()
         cursor.close()
@@ -175,11 +255,11 @@ class OracleMetadataExtractor:
         ORDER BY i.index_name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query, {'owner': schema, 'table_name': table})
 
         indexes = []
-        for row in cursor.fetchall():
+        for row in cursor:
             indexes.append({
                 'name': row[0],
                 'type': row[1],
@@ -196,7 +276,7 @@ class OracleMetadataExtractor:
         SELECT
             c.constraint_name,
             r.owner AS ref_schema,
-            rc.table_name AS ref_table,
+            r.table_name AS ref_table,
             LISTAGG(cc.column_name, ',') WITHIN GROUP (ORDER BY cc.position) AS columns,
             LISTAGG(rcc.column_name, ',') WITHIN GROUP (ORDER BY rcc.position) AS ref_columns,
             c.delete_rule
@@ -205,21 +285,20 @@ class OracleMetadataExtractor:
             AND c.owner = cc.owner
         JOIN all_constraints r ON c.r_constraint_name = r.constraint_name
             AND c.r_owner = r.owner
-        JOIN all_constraints rc ON r.constraint_name = rc.constraint_name
-            AND r.owner = rc.owner
         JOIN all_cons_columns rcc ON r.constraint_name = rcc.constraint_name
             AND r.owner = rcc.owner
+            AND rcc.position = cc.position
         WHERE c.constraint_type = 'R'
             AND c.owner = UPPER(:owner)
             AND c.table_name = UPPER(:table_name)
-        GROUP BY c.constraint_name, r.owner, rc.table_name, c.delete_rule
+        GROUP BY c.constraint_name, r.owner, r.table_name, c.delete_rule
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query, {'owner': schema, 'table_name': table})
 
         foreign_keys = []
-        for row in cursor.fetchall():
+        for row in cursor:
             foreign_keys.append({
                 'name': row[0],
                 'ref_schema': row[1],
@@ -232,28 +311,203 @@ class OracleMetadataExtractor:
         cursor.close()
         return foreign_keys
 
+    def _get_all_table_ddl(self, owner: str) -> Dict[Tuple[str, str], str]:
+        """
+        Get DBMS_METADATA DDL for every table of an owner in one query, keyed by (owner, table_name);
+        empty if DBMS_METADATA is unavailable, so callers fall back to get_table_ddl
+        """
+        query = """
+        SELECT
+            owner,
+            table_name,
+            DBMS_METADATA.GET_DDL('TABLE', table_name, owner)
+        FROM all_tables
+        WHERE owner = UPPER(:owner)
+            AND nested = 'NO'
+            AND secondary = 'N'
+            AND (iot_type IS NULL OR iot_type = 'IOT')
+        """
+
+        cursor = self._cursor()
+        ddl = {}
+        try:
+            cursor.execute("""
+            BEGIN
+                DBMS_METADATA.SET_TRANSFORM_PARAM(DBMS_METADATA.SESSION_TRANSFORM, 'SQLTERMINATOR', TRUE);
+            END;
+            """)
+            cursor.execute(query, {'owner': owner})
+            for row in cursor:
+                ddl[(row[0], row[1])] = f"-- Table: {row[0]}.{row[1]}\n{row[2].strip()}"
+        except cx_Oracle.DatabaseError as e:
+            print(f"Warning: DBMS_METADATA DDL unavailable ({e}); reconstructing table DDL from columns")
+            ddl = {}
+        finally:
+            cursor.close()
+        return ddl
+
+    def _get_all_columns(self, owner: str) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get column information for every table of an owner, keyed by (owner, table_name)"""
+        query = """
+        SELECT
+            owner,
+            table_name,
+            column_name,
+            data_type,
+            data_length,
+            data_precision,
+            data_scale,
+            nullable,
+            data_default,
+            column_id
+        FROM all_tab_columns
+        WHERE owner = UPPER(:owner)
+        ORDER BY owner, table_name, column_id
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query, {'owner': owner})
+
+        columns = defaultdict(list)
+        for row in cursor:
+            columns[(row[0], row[1])].append(dict(zip(COLUMN_FIELDS, row[2:])))
+
+        cursor.close()
+        return columns
+
+    def _get_all_pks(self, owner: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Get primary key information for every table of an owner, keyed by (owner, table_name)"""
+        query = """
+        SELECT
+            c.owner,
+            c.table_name,
+            c.constraint_name,
+            LISTAGG(cc.column_name, ',') WITHIN GROUP (ORDER BY cc.position) AS columns
+        FROM all_constraints c
+        JOIN all_cons_columns cc ON c.constraint_name = cc.constraint_name
+            AND c.owner = cc.owner
+        WHERE c.constraint_type = 'P'
+            AND c.owner = UPPER(:owner)
+        GROUP BY c.owner, c.table_name, c.constraint_name
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query, {'owner': owner})
+
+        primary_keys = {}
+        for row in cursor:
+            primary_keys[(row[0], row[1])] = {
+                'name': row[2],
+                'columns': row[3].split(',')
+            }
+
+        cursor.close()
+        return primary_keys
+
+    def _get_all_indexes(self, owner: str) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get all non-primary-key indexes of an owner, keyed by (owner, table_name)"""
+        query = """
+        SELECT
+            i.owner,
+            i.table_name,
+            i.index_name,
+            i.index_type,
+            i.uniqueness,
+            LISTAGG(ic.column_name, ',') WITHIN GROUP (ORDER BY ic.column_position) AS columns
+        FROM all_indexes i
+        LEFT JOIN all_ind_columns ic ON i.index_name = ic.index_name
+            AND i.owner = ic.index_owner
+        WHERE i.owner = UPPER(:owner)
+            AND NOT EXISTS (
+                SELECT 1 FROM all_constraints c
+                WHERE c.constraint_type = 'P'
+                    AND c.index_name = i.index_name
+                    AND c.owner = i.owner
+            )
+        GROUP BY i.owner, i.table_name, i.index_name, i.index_type, i.uniqueness
+        ORDER BY i.owner, i.table_name, i.index_name
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query, {'owner': owner})
+
+        indexes = defaultdict(list)
+        for row in cursor:
+            indexes[(row[0], row[1])].append({
+                'name': row[2],
+                'type': row[3],
+                'is_unique': row[4] == 'UNIQUE',
+                'columns': row[5].split(',') if row[5] else []
+            })
+
+        cursor.close()
+        return indexes
+
+    def _get_all_fks(self, owner: str) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get foreign key constraints of an owner, keyed by (owner, table_name)"""
+        query = """
+        SELECT
+            c.owner,
+            c.table_name,
+            c.constraint_name,
+            r.owner AS ref_schema,
+            r.table_name AS ref_table,
+            LISTAGG(cc.column_name, ',') WITHIN GROUP (ORDER BY cc.position) AS columns,
+            LISTAGG(rcc.column_name, ',') WITHIN GROUP (ORDER BY rcc.position) AS ref_columns,
+            c.delete_rule
+        FROM all_constraints c
+        JOIN all_cons_columns cc ON c.constraint_name = cc.constraint_name
+            AND c.owner = cc.owner
+        JOIN all_constraints r ON c.r_constraint_name = r.constraint_name
+            AND c.r_owner = r.owner
+        JOIN all_cons_columns rcc ON r.constraint_name = rcc.constraint_name
+            AND r.owner = rcc.owner
+            AND rcc.position = cc.position
+        WHERE c.constraint_type = 'R'
+            AND c.owner = UPPER(:owner)
+        GROUP BY c.owner, c.table_name, c.constraint_name, r.owner, r.table_name, c.delete_rule
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query, {'owner': owner})
+
+        foreign_keys = defaultdict(list)
+        for row in cursor:
+            foreign_keys[(row[0], row[1])].append({
+                'name': row[2],
+                'ref_schema': row[3],
+                'ref_table': row[4],
+                'columns': row[5].split(','),
+                'ref_columns': row[6].split(','),
+                'on_delete': row[7]
+            })
+
+        cursor.close()
+        return foreign_keys
+
     def get_views(self) -> List[Dict[str, str]]:
         """Get all views and their definitions"""
         query = """
         SELECT
             owner,
             view_name,
-            text
+            text,
+            owner || '.' || view_name AS full_name
         FROM all_views
         WHERE owner = UPPER(:owner)
         ORDER BY owner, view_name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query, {'owner': self.username})
 
         views = []
-        for row in cursor.fetchall():
+        for row in cursor:
             views.append({
                 'schema': row[0],
                 'name': row[1],
                 'definition': row[2],
-                'full_name': f'{row[0]}.{row[1]}'
+                'full_name': row[3]
             })
 
         cursor.close()
@@ -265,38 +519,44 @@ class OracleMetadataExtractor:
         SELECT
             owner,
             object_name,
-            object_type
+            object_type,
+            owner || '.' || object_name AS full_name
         FROM all_procedures
         WHERE owner = UPPER(:owner)
             AND object_type IN ('PROCEDURE', 'FUNCTION')
         ORDER BY owner, object_name
         """
 
-        cursor = self.connection.cursor()
+        # Get source code for every procedure/function of the owner in one query
+        source_query = """
+        SELECT
+            owner,
+            name,
+            type,
+            text
+        FROM all_source
+        WHERE owner = UPPER(:owner)
+            AND type IN ('PROCEDURE', 'FUNCTION')
+        ORDER BY owner, name, type, line
+        """
+
+        cursor = self._cursor()
+        cursor.execute(source_query, {'owner': self.username})
+
+        sources = defaultdict(list)
+        for row in cursor:
+            sources[(row[0], row[1], row[2])].append(row[3])
+
         cursor.execute(query, {'owner': self.username})
 
         procedures = []
-        for row in cursor.fetchall():
-            # Get source code
-            source_query = """
-            SELECT text
-            FROM all_source
-            WHERE owner = :owner
-                AND name = :name
-                AND type = :type
-            ORDER BY line
-            """
-            src_cursor = self.connection.cursor()
-            src_cursor.execute(source_query, {'owner': row[0], 'name': row[1], 'type': row[2]})
-            source_lines = [src_row[0] for src_row in src_cursor.fetchall()]
-            src_cursor.close()
-
+        for row in cursor:
             procedures.append({
                 'schema': row[0],
                 'name': row[1],
                 'type': row[2],
-                'definition': ''.join(source_lines),
-                'full_name': f'{row[0]}.{row[1]}'
+                'definition': ''.join(sources.get((row[0], row[1], row[2]), [])),
+                'full_name': row[3]
             })
 
         cursor.close()
@@ -313,17 +573,18 @@ class OracleMetadataExtractor:
             increment_by,
             cycle_flag,
             cache_size,
-            last_number
+            last_number,
+            sequence_owner || '.' || sequence_name AS full_name
         FROM all_sequences
         WHERE sequence_owner = UPPER(:owner)
         ORDER BY sequence_owner, sequence_name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query, {'owner': self.username})
 
         sequences = []
-        for row in cursor.fetchall():
+        for row in cursor:
             sequences.append({
                 'schema': row[0],
                 'name': row[1],
@@ -333,14 +594,44 @@ class OracleMetadataExtractor:
                 'cycle': row[5] == 'Y',
                 'cache': row[6],
                 'last_number': row[7],
-                'full_name': f'{row[0]}.{row[1]}'
+                'full_name': row[8]
             })
 
         cursor.close()
         return sequences
 
+    def _get_schema_fingerprint(self) -> str:
+        """Cheap fingerprint of the schema's DDL state: object count and latest DDL time"""
+        query = """
+        SELECT
+            COUNT(*),
+            TO_CHAR(MAX(last_ddl_time), 'YYYYMMDDHH24MISS')
+        FROM all_objects
+        WHERE owner = UPPER(:owner)
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query, {'owner': self.username})
+        row = cursor.fetchone()
+        cursor.close()
+        return f'{row[0]}:{row[1]}'
+
     def extract_complete_metadata(self) -> Dict[str, Any]:
         """Extract all metadata from the database"""
+        # Reuse a cached extraction while the schema is unchanged; sequences are always
+        # re-read since last_number moves without any DDL
+        cache_file = None
+        if self.cache_dir:
+            cache_file = metadata_cache.cache_path(
+                self.cache_dir, 'oracle', self.server, self.port, self.database, self.username.upper(),
+                self.include_ddl, self.native_ddl, self._get_schema_fingerprint()
+            )
+            metadata = metadata_cache.load(cache_file)
+            if metadata is not None:
+                print(f"Using cached metadata: {cache_file}")
+                metadata['sequences'] = self.get_sequences()
+                return metadata
+
         metadata = {
             'database': self.database,
             'server': self.server,
@@ -351,28 +642,49 @@ class OracleMetadataExtractor:
             'sequences': []
         }
 
-        # Get tables with full details
-        tables = self.get_tables_list()
+        # The catalog queries are independent, so run them concurrently on pooled connections.
+        # Columns, keys, indexes and foreign keys are fetched for the whole schema in one query each
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            tables_future = executor.submit(self._run_pooled, 'get_tables_list')
+            columns_future = executor.submit(self._run_pooled, '_get_all_columns', self.username)
+            primary_keys_future = executor.submit(self._run_pooled, '_get_all_pks', self.username)
+            indexes_future = executor.submit(self._run_pooled, '_get_all_indexes', self.username)
+            foreign_keys_future = executor.submit(self._run_pooled, '_get_all_fks', self.username)
+            views_future = executor.submit(self._run_pooled, 'get_views')
+            procedures_future = executor.submit(self._run_pooled, 'get_procedures')
+            sequences_future = executor.submit(self._run_pooled, 'get_sequences')
+            if self.include_ddl and self.native_ddl:
+                table_ddl_future = executor.submit(self._run_pooled, '_get_all_table_ddl', self.username)
+
+            tables = tables_future.result()
+            columns = columns_future.result()
+            primary_keys = primary_keys_future.result()
+            indexes = indexes_future.result()
+            foreign_keys = foreign_keys_future.result()
+            metadata['views'] = views_future.result()
+            metadata['procedures'] = procedures_future.result()
+            metadata['sequences'] = sequences_future.result()
+            table_ddl = table_ddl_future.result() if self.include_ddl and self.native_ddl else {}
+
         for table in tables:
+            key = (table['schema'], table['table'])
+            table_columns = columns.get(key, [])
+            ddl = None
+            if self.include_ddl:
+                ddl = table_ddl.get(key) or self.get_table_ddl(table['schema'], table['table'], table_columns)
             table_meta = {
                 'schema': table['schema'],
                 'name': table['table'],
                 'full_name': table['full_name'],
-                'ddl': self.get_table_ddl(table['schema'], table['table']),
-                'columns': self._get_columns(table['schema'], table['table']),
-                'primary_key': self.get_primary_key(table['schema'], table['table']),
-                'indexes': self.get_indexes(table['schema'], table['table']),
-                'foreign_keys': self.get_foreign_keys(table['schema'], table['table'])
+                'ddl': ddl,
+                'columns': table_columns,
+                'primary_key': primary_keys.get(key),
+                'indexes': indexes.get(key, []),
+                'foreign_keys': foreign_keys.get(key, [])
             }
             metadata['tables'].append(table_meta)
 
-        # Get views
-        metadata['views'] = self.get_views()
-
-        # Get procedures and functions
-        metadata['procedures'] = self.get_procedures()
-
-        # Get sequences
-        metadata['sequences'] = self.get_sequences()
+        if cache_file:
+            metadata_cache.store(cache_file, metadata)
 
         return metadata
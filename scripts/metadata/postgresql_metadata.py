@@ -3,36 +3,242 @@ PostgreSQL metadata extraction module
 Extracts complete schema information including tables, views, stored procedures, functions, indexes, etc.
 """
 
-import psycopg2
-from typing import Dict, List, Any
+import psycopg
+import os
+import re
+import shutil
+import subprocess
+from collections import defaultdict
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import queue
+from typing import Dict, List, Any, Tuple
 import json
 
+import metadata_cache
+
+# TOC comment pg_dump writes before each object, e.g. "-- Name: orders; Type: TABLE; Schema: public; Owner: -"
+PG_DUMP_ENTRY = re.compile(r'^-- Name: (?P<name>.*?); Type: (?P<type>.*?); Schema: (?P<schema>.*?); Owner: .*$', re.M)
+
+# Column defaults (serial nextval) and identity definitions are dumped as separate entries altering the table,
+# e.g. 'ALTER TABLE ONLY public.orders ALTER COLUMN id SET DEFAULT ...'
+PG_DUMP_IDENTIFIER = r'(?:"(?:[^"]|"")*"|[^\s."]+)'
+PG_DUMP_ALTER_COLUMN = re.compile(
+    rf'^ALTER TABLE (?:ONLY )?(?P<schema>{PG_DUMP_IDENTIFIER})\.(?P<table>{PG_DUMP_IDENTIFIER}) ALTER COLUMN '
+)
+
+# Seconds to wait for pg_dump --schema-only before reconstructing DDL from columns instead
+PG_DUMP_TIMEOUT = 600
+
+# Keys of a column dict, in the order the column queries select them
+COLUMN_FIELDS = (
+    'name', 'data_type', 'udt_name', 'character_maximum_length', 'numeric_precision', 'numeric_scale',
+    'is_nullable', 'column_default', 'ordinal_position'
+)
+
+
+# Catalog queries shared by the per-table and bulk (whole-database) methods; {filter} narrows the
+# relations. They read pg_catalog directly rather than the information_schema views (which add
+# privilege checks and extra joins), using information_schema's own helper functions so the
+# values match information_schema.columns
+COLUMNS_QUERY = """
+SELECT
+    n.nspname AS table_schema,
+    c.relname AS table_name,
+    a.attname AS column_name,
+    CASE
+        WHEN COALESCE(bt.typelem, t.typelem) <> 0 AND COALESCE(bt.typlen, t.typlen) = -1 THEN 'ARRAY'
+        WHEN COALESCE(bn.nspname, tn.nspname) = 'pg_catalog' THEN format_type(COALESCE(bt.oid, t.oid), NULL)
+        ELSE 'USER-DEFINED'
+    END AS data_type,
+    COALESCE(bt.typname, t.typname) AS udt_name,
+    information_schema._pg_char_max_length(information_schema._pg_truetypid(a, t), information_schema._pg_truetypmod(a, t)),
+    information_schema._pg_numeric_precision(information_schema._pg_truetypid(a, t), information_schema._pg_truetypmod(a, t)),
+    information_schema._pg_numeric_scale(information_schema._pg_truetypid(a, t), information_schema._pg_truetypmod(a, t)),
+    NOT (a.attnotnull OR (t.typtype = 'd' AND t.typnotnull)) AS is_nullable,
+    pg_get_expr(ad.adbin, ad.adrelid) AS column_default,
+    a.attnum AS ordinal_position
+FROM pg_attribute a
+JOIN pg_class c ON c.oid = a.attrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_type t ON t.oid = a.atttypid
+JOIN pg_namespace tn ON tn.oid = t.typnamespace
+LEFT JOIN pg_type bt ON t.typtype = 'd' AND bt.oid = t.typbasetype
+LEFT JOIN pg_namespace bn ON bn.oid = bt.typnamespace
+LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+WHERE c.relkind IN ('r', 'p')
+    AND a.attnum > 0
+    AND NOT a.attisdropped
+    {filter}
+ORDER BY n.nspname, c.relname, a.attnum
+"""
+
+PRIMARY_KEYS_QUERY = """
+SELECT
+    n.nspname AS table_schema,
+    c.relname AS table_name,
+    con.conname AS constraint_name,
+    array_agg(a.attname::text ORDER BY k.ord) AS columns
+FROM pg_constraint con
+JOIN pg_class c ON c.oid = con.conrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+WHERE con.contype = 'p'
+    {filter}
+GROUP BY n.nspname, c.relname, con.conname
+"""
+
+# conkey/confkey are unnested in lockstep so each column is paired with the column it references
+FOREIGN_KEYS_QUERY = """
+SELECT
+    n.nspname AS table_schema,
+    c.relname AS table_name,
+    con.conname AS constraint_name,
+    rn.nspname AS ref_schema,
+    rc.relname AS ref_table,
+    array_agg(a.attname::text ORDER BY k.ord) AS columns,
+    array_agg(ra.attname::text ORDER BY k.ord) AS ref_columns,
+    CASE con.confupdtype
+        WHEN 'a' THEN 'NO ACTION' WHEN 'r' THEN 'RESTRICT' WHEN 'c' THEN 'CASCADE'
+        WHEN 'n' THEN 'SET NULL' WHEN 'd' THEN 'SET DEFAULT'
+    END AS update_rule,
+    CASE con.confdeltype
+        WHEN 'a' THEN 'NO ACTION' WHEN 'r' THEN 'RESTRICT' WHEN 'c' THEN 'CASCADE'
+        WHEN 'n' THEN 'SET NULL' WHEN 'd' THEN 'SET DEFAULT'
+    END AS delete_rule
+FROM pg_constraint con
+JOIN pg_class c ON c.oid = con.conrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_class rc ON rc.oid = con.confrelid
+JOIN pg_namespace rn ON rn.oid = rc.relnamespace
+CROSS JOIN LATERAL unnest(con.conkey, con.confkey) WITH ORDINALITY AS k(attnum, ref_attnum, ord)
+JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+JOIN pg_attribute ra ON ra.attrelid = con.confrelid AND ra.attnum = k.ref_attnum
+WHERE con.contype = 'f'
+    {filter}
+GROUP BY n.nspname, c.relname, con.conname, rn.nspname, rc.relname, con.confupdtype, con.confdeltype
+"""
+
+# Relation filters for the per-table and the bulk variants of the queries above
+TABLE_FILTER = "AND n.nspname = %s AND c.relname = %s"
+USER_SCHEMAS_FILTER = "AND n.nspname NOT IN ('pg_catalog', 'information_schema')"
+
+
+@functools.lru_cache(maxsize=None)
+def _qi(name: str) -> str:
+    """Quote an identifier for DDL (cached: schema and common column names repeat across tables)"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _fmt_length(col: Dict[str, Any]) -> str:
+    """varchar(n), bpchar(n), ... (written with the udt name)"""
+    if col['character_maximum_length']:
+        return f"{col['udt_name']}({col['character_maximum_length']})"
+    return col['data_type']
+
+
+def _fmt_numeric(col: Dict[str, Any]) -> str:
+    """numeric(p,s)"""
+    if col['numeric_precision']:
+        return f"{col['data_type']}({col['numeric_precision']},{col['numeric_scale']})"
+    return col['data_type']
+
+
+def _fmt_plain(col: Dict[str, Any]) -> str:
+    """Types written without modifiers"""
+    return col['data_type']
+
+
+# data_type -> function rendering the column's type in CREATE TABLE DDL
+# (character_maximum_length is only ever set for the character and bit types)
+TYPE_FORMATTERS = {
+    'character varying': _fmt_length,
+    'character': _fmt_length,
+    'bit varying': _fmt_length,
+    'bit': _fmt_length,
+    'numeric': _fmt_numeric,
+    'decimal': _fmt_numeric,
+}
+
 
 class PostgreSQLMetadataExtractor:
-    def __init__(self, server: str, database: str, username: str, password: str, port: int = 5432):
+    def __init__(self, server: str, database: str, username: str, password: str, port: int = 5432,
+                 max_workers: int = 4, cache_dir: str = None, native_ddl: bool = True,
+                 include_ddl: bool = True):
         self.server = server
         self.database = database
         self.username = username
         self.password = password
         self.port = port
+        self.max_workers = max(1, max_workers)
+        # Directory for the on-disk metadata cache; None disables caching
+        self.cache_dir = cache_dir
+        # Take table DDL from pg_dump (when installed) rather than reconstructing it from the columns
+        self.native_ddl = native_ddl
+        # Generate table DDL during extraction; when off, 'ddl' is None and callers that need it
+        # can render it on demand with get_table_ddl(schema, table, table['columns'])
+        self.include_ddl = include_ddl
         self.connection = None
+        # Connections handed to metadata worker threads; the main connection is one of them
+        self._pool = None
+        self._pool_connections = []
 
-    def connect(self):
-        """Establish connection to PostgreSQL"""
-        self.connection = psycopg2.connect(
+    def _open_connection(self):
+        """Open a new connection to PostgreSQL"""
+        return psycopg.connect(
             host=self.server,
             port=self.port,
-            database=self.database,
+            dbname=self.database,
             user=self.username,
             password=self.password
         )
+
+    def connect(self):
+        """Establish connection to PostgreSQL, plus worker connections for concurrent metadata queries"""
+        self.connection = self._open_connection()
+        self._pool = queue.Queue()
+        self._pool_connections = [self.connection] + [self._open_connection() for _ in range(self.max_workers - 1)]
+        for connection in self._pool_connections:
+            self._pool.put(connection)
         return self.connection
 
     def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        for connection in self._pool_connections:
+            if connection is not self.connection:
+                connection.close()
+        self._pool_connections = []
         if self.connection:
             self.connection.close()
 
+    def _run_pooled(self, method_name: str, *args):
+        """Run an extractor method on a connection taken from the pool (connections are not shared across threads)"""
+        connection = self._pool.get()
+        try:
+            worker = copy.copy(self)
+            worker.connection = connection
+            return getattr(worker, method_name)(*args)
+        finally:
+            self._pool.put(connection)
+
+    def _copy_rows(self, query: str, types: List[str] = None):
+        """
+        Stream a (parameterless) query's rows through COPY ... TO STDOUT, which skips the regular
+        result-set protocol; values are text unless their types are given, NULLs are None
+        """
+        # Both contexts close even if the consumer stops early or raises; psycopg then cancels the
+        # unfinished COPY, which aborts the transaction, so roll back to leave the connection usable
+        try:
+            with self.connection.cursor() as cursor, cursor.copy(f"COPY ({query}) TO STDOUT") as copy:
+                if types:
+                    copy.set_types(types)
+                yield from copy.rows()
+        finally:
+            if self.connection.info.transaction_status == psycopg.pq.TransactionStatus.INERROR:
+                self.connection.rollback()
+
     def get_tables_list(self) -> List[Dict[str, str]]:
         """Get list of all tables with schema"""
         query = """
@@ -49,7 +255,7 @@ class PostgreSQLMetadataExtractor:
         cursor.execute(query)
 
         tables = []
-        for row in cursor.fetchall():
+        for row in cursor:
             tables.append({
                 'schema': row[0],
                 'table': row[1],
@@ -59,31 +265,22 @@ class PostgreSQLMetadataExtractor:
         cursor.close()
         return tables
 
-    def get_table_ddl(self, schema: str, table: str) -> str:
-        """Generate CREATE TABLE DDL for a specific table"""
+    def get_table_ddl(self, schema: str, table: str, columns: List[Dict[str, Any]] = None) -> str:
+        """Generate CREATE TABLE DDL for a specific table (columns are fetched if not supplied)"""
         ddl_parts = []
         ddl_parts.append(f"-- Table: {schema}.{table}")
-        ddl_parts.append(f'CREATE TABLE "{schema}"."{table}" (')
+        ddl_parts.append(f'CREATE TABLE {_qi(schema)}.{_qi(table)} (')
 
         # Get columns
-        columns = self._get_columns(schema, table)
+        if columns is None:
+            columns = self._get_columns(schema, table)
         column_defs = []
 
         for col in columns:
-            col_def = f'    "{col["name"]}" {col["data_type"]}'
-
-            if col['character_maximum_length']:
-                col_def = f'    "{col["name"]}" {col["udt_name"]}({col["character_maximum_length"]})'
-            elif col['numeric_precision'] and col['data_type'] in ('numeric', 'decimal'):
-                col_def = f'    "{col["name"]}" {col["data_type"]}({col["numeric_precision"]},{col["numeric_scale"]})'
-
-            if not col['is_nullable']:
-                col_def += " NOT NULL"
-
-            if col['column_default']:
-                col_def += f" DEFAULT {col['column_default']}"
-
-            column_defs.append(col_def)
+            type_text = TYPE_FORMATTERS.get(col['data_type'], _fmt_plain)(col)
+            not_null = "" if col['is_nullable'] else " NOT NULL"
+            default = f" DEFAULT {col['column_default']}" if col['column_default'] else ""
+            column_defs.append(f'    {_qi(col["name"])} {type_text}{not_null}{default}')
 
         ddl_parts.append(",\n".join(column_defs))
         ddl_parts.append(");")
@@ -92,58 +289,21 @@ class PostgreSQLMetadataExtractor:
 
     def _get_columns(self, schema: str, table: str) -> List[Dict[str, Any]]:
         """Get column information for a table"""
-        query = """
-        SELECT
-            column_name,
-            data_type,
-            udt_name,
-            character_maximum_length,
-            numeric_precision,
-            numeric_scale,
-            is_nullable::boolean,
-            column_default,
-            ordinal_position
-        FROM information_schema.columns
-        WHERE table_schema = %s AND table_name = %s
-        ORDER BY ordinal_position
-        """
+        query = COLUMNS_QUERY.format(filter=TABLE_FILTER)
 
         cursor = self.connection.cursor()
         cursor.execute(query, (schema, table))
 
         columns = []
-        for row in cursor.fetchall():
-            columns.append({
-                'name': row[0],
-                'data_type': row[1],
-                'udt_name': row[2],
-                'character_maximum_length': row[3],
-                'numeric_precision': row[4],
-                'numeric_scale': row[5],
-                'is_nullable': row[6],
-                'column_default': row[7],
-                'ordinal_position': row[8]
-            })
+        for row in cursor:
+            columns.append(dict(zip(COLUMN_FIELDS, row[2:])))
 
         cursor.close()
         return columns
 
     def get_primary_key(self, schema: str, table: str) -> Dict[str, Any]:
         """Get primary key information"""
-        query = """
-        SELECT
-            tc.constraint_name,
-            string_agg(kcu.column_name, ',' ORDER BY kcu.ordinal_position) AS columns
-        FROM information_schema.table_constraints tc
-        JOIN information_schema.key_column_usage kcu
-            ON tc.constraint_name = kcu.constraint_name
-            AND tc.table_schema = kcu.table_schema
-            AND tc.table_name = kcu.table_name
-        WHERE tc.constraint_type = 'PRIMARY KEY'
-            AND tc.table_schema = %s
-            AND tc.table_name = %s
-        GROUP BY tc.constraint_name
-        """
+        query = PRIMARY_KEYS_QUERY.format(filter=TABLE_FILTER)
 
         cursor = self.connection.cursor()
         cursor.execute(query, (schema, table))
@@ -152,8 +312,8 @@ class PostgreSQLMetadataExtractor:
 
         if row:
             return {
-                'name': row[0],
-                'columns': row[1].split(',')
+                'name': row[2],
+                'columns': row[3]
             }
         return None
 
@@ -164,7 +324,7 @@ class PostgreSQLMetadataExtractor:
             i.relname AS index_name,
             am.amname AS index_type,
             ix.indisunique AS is_unique,
-            array_to_string(array_agg(a.attname ORDER BY array_position(ix.indkey, a.attnum)), ',') AS columns,
+            array_agg(a.attname::text ORDER BY array_position(ix.indkey, a.attnum)) AS columns,
             pg_get_expr(ix.indpred, ix.indrelid) AS filter_condition
         FROM pg_class t
         JOIN pg_namespace n ON n.oid = t.relnamespace
@@ -183,12 +343,12 @@ class PostgreSQLMetadataExtractor:
         cursor.execute(query, (schema, table))
 
         indexes = []
-        for row in cursor.fetchall():
+        for row in cursor:
             indexes.append({
                 'name': row[0],
                 'type': row[1],
                 'is_unique': row[2],
-                'columns': row[3].split(','),
+                'columns': row[3],
                 'filter': row[4]
             })
 
@@ -197,44 +357,174 @@ class PostgreSQLMetadataExtractor:
 
     def get_foreign_keys(self, schema: str, table: str) -> List[Dict[str, Any]]:
         """Get foreign key constraints"""
-        query = """
-        SELECT
-            tc.constraint_name,
-            ccu.table_schema AS ref_schema,
-            ccu.table_name AS ref_table,
-            string_agg(kcu.column_name, ',' ORDER BY kcu.ordinal_position) AS columns,
-            string_agg(ccu.column_name, ',' ORDER BY kcu.ordinal_position) AS ref_columns,
-            rc.update_rule,
-            rc.delete_rule
-        FROM information_schema.table_constraints tc
-        JOIN information_schema.key_column_usage kcu
-            ON tc.constraint_name = kcu.constraint_name
-            AND tc.table_schema = kcu.table_schema
-        JOIN information_schema.constraint_column_usage ccu
-            ON tc.constraint_name = ccu.constraint_name
-            AND tc.table_schema = ccu.table_schema
-        JOIN information_schema.referential_constraints rc
-            ON tc.constraint_name = rc.constraint_name
-            AND tc.table_schema = rc.constraint_schema
-        WHERE tc.constraint_type = 'FOREIGN KEY'
-            AND tc.table_schema = %s
-            AND tc.table_name = %s
-        GROUP BY tc.constraint_name, ccu.table_schema, ccu.table_name, rc.update_rule, rc.delete_rule
-        """
+        query = FOREIGN_KEYS_QUERY.format(filter=TABLE_FILTER)
 
         cursor = self.connection.cursor()
         cursor.execute(query, (schema, table))
 
         foreign_keys = []
-        for row in cursor.fetchall():
+        for row in cursor:
             foreign_keys.append({
-                'name': row[0],
-                'ref_schema': row[1],
-                'ref_table': row[2],
-                'columns': row[3].split(','),
-                'ref_columns': row[4].split(','),
-                'on_update': row[5],
-                'on_delete': row[6]
+                'name': row[2],
+                'ref_schema': row[3],
+                'ref_table': row[4],
+                'columns': row[5],
+                'ref_columns': row[6],
+                'on_update': row[7],
+                'on_delete': row[8]
+            })
+
+        cursor.close()
+        return foreign_keys
+
+    def _get_all_table_ddl(self) -> Dict[Tuple[str, str], str]:
+        """
+        Get CREATE TABLE statements for every table from one pg_dump --schema-only run, keyed by
+        (schema, table); empty if pg_dump is unavailable or fails, so callers fall back to get_table_ddl
+        """
+        pg_dump = shutil.which('pg_dump')
+        if not pg_dump:
+            print("Warning: pg_dump not found; reconstructing table DDL from columns")
+            return {}
+
+        # -w: never prompt for a password, fail instead
+        command = [pg_dump, '--schema-only', '--no-owner', '--no-privileges', '-w', '--port', str(self.port)]
+        if self.server:
+            command += ['--host', self.server]
+        if self.username:
+            command += ['--username', self.username]
+        command += ['--dbname', self.database]
+        env = dict(os.environ)
+        if self.password:
+            env['PGPASSWORD'] = self.password
+        try:
+            result = subprocess.run(command, env=env, capture_output=True, text=True, check=True, timeout=PG_DUMP_TIMEOUT)
+        except subprocess.CalledProcessError as e:
+            print(f"Warning: pg_dump failed ({e.stderr.strip()}); reconstructing table DDL from columns")
+            return {}
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Warning: pg_dump failed ({e}); reconstructing table DDL from columns")
+            return {}
+
+        dump = result.stdout
+        entries = list(PG_DUMP_ENTRY.finditer(dump))
+        statements = []
+        for entry, next_entry in zip(entries, entries[1:] + [None]):
+            body = dump[entry.end():next_entry.start() if next_entry else len(dump)]
+            # Drop the comment lines framing each entry, keeping the statement itself
+            statement = '\n'.join(line for line in body.splitlines() if not line.startswith('--')).strip()
+            statements.append((entry, statement))
+
+        ddl = {}
+        for entry, statement in statements:
+            if entry['type'] == 'TABLE':
+                ddl[(entry['schema'], entry['name'])] = f"-- Table: {entry['schema']}.{entry['name']}\n{statement}"
+
+        # Append serial defaults and identity definitions to the table they alter
+        for entry, statement in statements:
+            if entry['type'] not in ('DEFAULT', 'SEQUENCE'):
+                continue
+            match = PG_DUMP_ALTER_COLUMN.match(statement)
+            if not match:
+                continue
+            key = (self._unquote_identifier(match['schema']), self._unquote_identifier(match['table']))
+            if key in ddl:
+                ddl[key] += f"\n{statement}"
+
+        return ddl
+
+    @staticmethod
+    def _unquote_identifier(identifier: str) -> str:
+        """Undo pg_dump's identifier quoting"""
+        if identifier.startswith('"'):
+            return identifier[1:-1].replace('""', '"')
+        return identifier
+
+    def _get_all_columns(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get column information for every user table, keyed by (schema, table)"""
+        query = COLUMNS_QUERY.format(filter=USER_SCHEMAS_FILTER)
+
+        column_types = ['text', 'text', 'text', 'text', 'text', 'int4', 'int4', 'int4', 'bool', 'text', 'int4']
+
+        columns = defaultdict(list)
+        for row in self._copy_rows(query, column_types):
+            columns[(row[0], row[1])].append(dict(zip(COLUMN_FIELDS, row[2:])))
+
+        return columns
+
+    def _get_all_pks(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Get primary key information for every user table, keyed by (schema, table)"""
+        query = PRIMARY_KEYS_QUERY.format(filter=USER_SCHEMAS_FILTER)
+
+        cursor = self.connection.cursor()
+        cursor.execute(query)
+
+        primary_keys = {}
+        for row in cursor:
+            primary_keys[(row[0], row[1])] = {
+                'name': row[2],
+                'columns': row[3]
+            }
+
+        cursor.close()
+        return primary_keys
+
+    def _get_all_indexes(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get all non-primary-key indexes of user tables, keyed by (schema, table)"""
+        query = """
+        SELECT
+            n.nspname AS schema_name,
+            t.relname AS table_name,
+            i.relname AS index_name,
+            am.amname AS index_type,
+            ix.indisunique AS is_unique,
+            array_agg(a.attname::text ORDER BY array_position(ix.indkey, a.attnum)) AS columns,
+            pg_get_expr(ix.indpred, ix.indrelid) AS filter_condition
+        FROM pg_class t
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        JOIN pg_index ix ON t.oid = ix.indrelid
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        JOIN pg_am am ON i.relam = am.oid
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(ix.indkey)
+        WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+            AND NOT ix.indisprimary
+        GROUP BY n.nspname, t.relname, i.relname, am.amname, ix.indisunique, ix.indpred, ix.indrelid
+        ORDER BY n.nspname, t.relname, i.relname
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(query)
+
+        indexes = defaultdict(list)
+        for row in cursor:
+            indexes[(row[0], row[1])].append({
+                'name': row[2],
+                'type': row[3],
+                'is_unique': row[4],
+                'columns': row[5],
+                'filter': row[6]
+            })
+
+        cursor.close()
+        return indexes
+
+    def _get_all_fks(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get foreign key constraints of user tables, keyed by (schema, table)"""
+        query = FOREIGN_KEYS_QUERY.format(filter=USER_SCHEMAS_FILTER)
+
+        cursor = self.connection.cursor()
+        cursor.execute(query)
+
+        foreign_keys = defaultdict(list)
+        for row in cursor:
+            foreign_keys[(row[0], row[1])].append({
+                'name': row[2],
+                'ref_schema': row[3],
+                'ref_table': row[4],
+                'columns': row[5],
+                'ref_columns': row[6],
+                'on_update': row[7],
+                'on_delete': row[8]
             })
 
         cursor.close()
@@ -256,7 +546,7 @@ class PostgreSQLMetadataExtractor:
         cursor.execute(query)
 
         views = []
-        for row in cursor.fetchall():
+        for row in cursor:
             views.append({
                 'schema': row[0],
                 'name': row[1],
@@ -286,11 +576,8 @@ class PostgreSQLMetadataExtractor:
         ORDER BY n.nspname, p.proname
         """
 
-        cursor = self.connection.cursor()
-        cursor.execute(query)
-
         functions = []
-        for row in cursor.fetchall():
+        for row in self._copy_rows(query):
             functions.append({
                 'schema': row[0],
                 'name': row[1],
@@ -299,7 +586,6 @@ class PostgreSQLMetadataExtractor:
                 'full_name': f'{row[0]}.{row[1]}'
             })
 
-        cursor.close()
         return functions
 
     def get_sequences(self) -> List[Dict[str, Any]]:
@@ -323,7 +609,7 @@ class PostgreSQLMetadataExtractor:
         cursor.execute(query)
 
         sequences = []
-        for row in cursor.fetchall():
+        for row in cursor:
             sequences.append({
                 'schema': row[0],
                 'name': row[1],
@@ -339,8 +625,46 @@ class PostgreSQLMetadataExtractor:
         cursor.close()
         return sequences
 
+    def _get_schema_fingerprint(self) -> str:
+        """
+        Cheap fingerprint of the catalog state: row count and newest row version (xmin) of each
+        catalog that holds extracted DDL, so creates, alters and drops all change it
+        """
+        query = """
+        SELECT string_agg(catalog || ':' || row_count || ':' || max_xmin, ',' ORDER BY catalog)
+        FROM (
+            SELECT 'pg_namespace' AS catalog, count(*) AS row_count, coalesce(max(xmin::text::bigint), 0) AS max_xmin FROM pg_namespace
+            UNION ALL SELECT 'pg_class', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_class
+            UNION ALL SELECT 'pg_attribute', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_attribute
+            UNION ALL SELECT 'pg_attrdef', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_attrdef
+            UNION ALL SELECT 'pg_constraint', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_constraint
+            UNION ALL SELECT 'pg_index', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_index
+            UNION ALL SELECT 'pg_proc', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_proc
+            UNION ALL SELECT 'pg_rewrite', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_rewrite
+            UNION ALL SELECT 'pg_sequence', count(*), coalesce(max(xmin::text::bigint), 0) FROM pg_sequence
+        ) catalogs
+        """
+
+        cursor = self.connection.cursor()
+        cursor.execute(query)
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0]
+
     def extract_complete_metadata(self) -> Dict[str, Any]:
         """Extract all metadata from the database"""
+        # Reuse a cached extraction while the catalog is unchanged
+        cache_file = None
+        if self.cache_dir:
+            cache_file = metadata_cache.cache_path(
+                self.cache_dir, 'postgresql', self.server, self.port, self.database, self.username,
+                self.include_ddl, self.native_ddl, self._get_schema_fingerprint()
+            )
+            metadata = metadata_cache.load(cache_file)
+            if metadata is not None:
+                print(f"Using cached metadata: {cache_file}")
+                return metadata
+
         metadata = {
             'database': self.database,
             'server': self.server,
@@ -350,28 +674,50 @@ class PostgreSQLMetadataExtractor:
             'sequences': []
         }
 
-        # Get tables with full details
-        tables = self.get_tables_list()
+        # The catalog queries are independent, so run them concurrently on pooled connections.
+        # Columns, keys, indexes and foreign keys are fetched for all tables in one query each
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            tables_future = executor.submit(self._run_pooled, 'get_tables_list')
+            columns_future = executor.submit(self._run_pooled, '_get_all_columns')
+            primary_keys_future = executor.submit(self._run_pooled, '_get_all_pks')
+            indexes_future = executor.submit(self._run_pooled, '_get_all_indexes')
+            foreign_keys_future = executor.submit(self._run_pooled, '_get_all_fks')
+            views_future = executor.submit(self._run_pooled, 'get_views')
+            functions_future = executor.submit(self._run_pooled, 'get_functions')
+            sequences_future = executor.submit(self._run_pooled, 'get_sequences')
+            if self.include_ddl and self.native_ddl:
+                # pg_dump opens its own connection, so it does not take one from the pool
+                table_ddl_future = executor.submit(self._get_all_table_ddl)
+
+            tables = tables_future.result()
+            columns = columns_future.result()
+            primary_keys = primary_keys_future.result()
+            indexes = indexes_future.result()
+            foreign_keys = foreign_keys_future.result()
+            metadata['views'] = views_future.result()
+            metadata['functions'] = functions_future.result()
+            metadata['sequences'] = sequences_future.result()
+            table_ddl = table_ddl_future.result() if self.include_ddl and self.native_ddl else {}
+
         for table in tables:
+            key = (table['schema'], table['table'])
+            table_columns = columns.get(key, [])
+            ddl = None
+            if self.include_ddl:
+                ddl = table_ddl.get(key) or self.get_table_ddl(table['schema'], table['table'], table_columns)
             table_meta = {
                 'schema': table['schema'],
                 'name': table['table'],
                 'full_name': table['full_name'],
-                'ddl': self.get_table_ddl(table['schema'], table['table']),
-                'columns': self._get_columns(table['schema'], table['table']),
-                'primary_key': self.get_primary_key(table['schema'], table['table']),
-                'indexes': self.get_indexes(table['schema'], table['table']),
-                'foreign_keys': self.get_foreign_keys(table['schema'], table['table'])
+                'ddl': ddl,
+                'columns': table_columns,
+                'primary_key': primary_keys.get(key),
+                'indexes': indexes.get(key, []),
+                'foreign_keys': foreign_keys.get(key, [])
             }
             metadata['tables'].append(table_meta)
 
-        # Get views
-        metadata['views'] = self.get_views()
-
-        # Get functions and procedures
-        metadata['functions'] = self.get_functions()
-
-        # Get sequences
-        metadata['sequences'] = self.get_sequences()
+        if cache_file:
+            metadata_cache.store(cache_file, metadata)
 
         return metadata
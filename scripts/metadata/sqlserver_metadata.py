@@ -4,37 +4,216 @@ Extracts complete schema information including tables, views, stored procedures,
 """
 
 import pyodbc
-from typing import Dict, List, Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import copy
+import functools
+import getpass
+import operator
+import queue
+import sys
+import threading
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
 import json
 
+import metadata_cache
+
+# Rows per fetchmany() batch when reading catalog result sets
+FETCH_ARRAY_SIZE = 2000
+
+# Seconds to wait for a login before giving up
+LOGIN_TIMEOUT = 30
+
+# ODBC drivers in order of preference
+ODBC_DRIVERS = ('ODBC Driver 18 for SQL Server', 'ODBC Driver 17 for SQL Server')
+
+# Largest TDS packet SQL Server accepts; module definitions are shipped in far fewer packets than with the 4 KB default
+PACKET_SIZE = 32767
+
+# Object lists extract_complete_metadata can load; each is fetched only when requested
+METADATA_SECTIONS = ('tables', 'views', 'stored_procedures', 'functions')
+
+# Result columns of the column queries, in the order _column_from_values unpacks them
+COLUMN_QUERY_FIELDS = (
+    'name', 'type_name', 'max_length', 'precision', 'scale', 'is_nullable', 'is_identity',
+    'seed_value', 'increment_value', 'default_definition', 'column_id'
+)
+
+# Types whose declaration carries a length (max_length is in bytes; -1 means MAX)
+_VARLEN = frozenset({'varchar', 'char', 'nvarchar', 'nchar', 'varbinary', 'binary'})
+
+
+def _fetch_rows(cursor):
+    """Yield the rows of the current result set in fetchmany() batches"""
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield from rows
+
+
+def _by_name(*fields: str):
+    """Sort key over name fields, case-insensitive like SQL Server's default collation"""
+    return lambda item: tuple(item[field].casefold() for field in fields)
+
+
+def _row_getter(cursor, names: Tuple[str, ...]):
+    """itemgetter for two or more named result columns, resolved to positions once per result set"""
+    # Indexing rows by position skips pyodbc's by-name attribute lookup on every cell
+    index = {column[0]: position for position, column in enumerate(cursor.description)}
+    return operator.itemgetter(*(index[name] for name in names))
+
+
+@functools.lru_cache(maxsize=None)
+def _odbc_driver() -> str:
+    """Pick the newest installed SQL Server ODBC driver, falling back to Driver 17"""
+    installed = set(pyodbc.drivers())
+    return next((driver for driver in ODBC_DRIVERS if driver in installed), ODBC_DRIVERS[-1])
+
+
+@functools.lru_cache(maxsize=None)
+def _format_type(type_name: str, max_length: int, precision: int, scale: int) -> str:
+    """Render a column type as declared in DDL, e.g. nvarchar(50) (cached: columns of one type share the string)"""
+    if type_name in _VARLEN:
+        if max_length == -1:
+            return f'{type_name}(MAX)'
+        if type_name.startswith('n'):
+            return f'{type_name}({max_length // 2})'
+        return f'{type_name}({max_length})'
+    if type_name in ('decimal', 'numeric'):
+        return f'{type_name}({precision},{scale})'
+    return type_name
+
+
+def _per_table_cache(method):
+    """Memoize a per-table getter on the instance, keyed by (method, schema, table)"""
+    @functools.wraps(method)
+    def wrapper(self, schema: str, table: str):
+        key = (method.__name__, schema, table)
+        if key not in self._table_cache:
+            self._table_cache[key] = method(self, schema, table)
+        return self._table_cache[key]
+    return wrapper
+
 
 class SqlServerMetadataExtractor:
-    def __init__(self, server: str, database: str, auth_type: str, username: str = None, password: str = None, port: int = 1433):
+    def __init__(self, server: str, database: str, auth_type: str, username: str = None, password: str = None, port: int = 1433,
+                 max_workers: int = 4, cache_dir: str = None):
         self.server = server
         self.database = database
         self.auth_type = auth_type
         self.username = username
         self.password = password
         self.port = port
+        self.max_workers = max(1, max_workers)
+        # Directory for the on-disk metadata cache; None disables caching
+        self.cache_dir = cache_dir
         self.connection = None
-
-    def connect(self):
-        """Establish connection to SQL Server"""
+        self._conn_str = None
+        # Connections handed to metadata worker threads, opened on demand up to max_workers;
+        # the main connection is one of them
+        self._pool = None
+        self._pool_connections = []
+        self._pool_lock = threading.Lock()
+        # Reusable cursors keyed by (connection, per-table query or None), shared by worker copies
+        self._cursors = {}
+        # Per-table getter results for the lifetime of the instance (see _per_table_cache);
+        # extract_complete_metadata fills it from the bulk queries
+        self._table_cache = {}
+
+    def _connection_string(self) -> str:
+        """Build the ODBC connection string shared by the main and worker connections"""
+        driver = _odbc_driver()
+        parts = [f'DRIVER={{{driver}}}', f'SERVER={self.server},{self.port}', f'DATABASE={self.database}']
         if self.auth_type == 'windows':
-            conn_str = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server},{self.port};DATABASE={self.database};Trusted_Connection=yes;'
+            parts.append('Trusted_Connection=yes')
         else:
-            conn_str = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server},{self.port};DATABASE={self.database};UID={self.username};PWD={self.password};'
+            parts.extend([f'UID={self.username}', f'PWD={self.password}'])
+        parts.extend([f'Packet Size={PACKET_SIZE}', 'APP=sql_maintenance'])
+        if driver != ODBC_DRIVERS[-1]:
+            # Driver 18 encrypts by default; keep Driver 17's behaviour so existing servers still connect
+            parts.append('Encrypt=Optional')
+        return ';'.join(parts) + ';'
+
+    def _open_connection(self):
+        """Open a new connection to SQL Server"""
+        return pyodbc.connect(self._conn_str, timeout=LOGIN_TIMEOUT)
 
-        self.connection = pyodbc.connect(conn_str)
+    def connect(self):
+        """Establish connection to SQL Server (worker connections are opened when first needed)"""
+        self._conn_str = self._connection_string()
+        self.connection = self._open_connection()
+        self._pool = queue.Queue()
+        self._pool_connections = [self.connection]
+        self._pool.put(self.connection)
         return self.connection
 
     def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        for cursor in self._cursors.values():
+            cursor.close()
+        self._cursors.clear()
+        for connection in self._pool_connections:
+            if connection is not None and connection is not self.connection:
+                connection.close()
+        self._pool_connections = []
         if self.connection:
             self.connection.close()
 
-    def get_tables_list(self) -> List[Dict[str, str]]:
-        """Get list of all tables with schema"""
+    @contextlib.contextmanager
+    def _acquire(self):
+        """Borrow a pooled connection, opening a new one while fewer than max_workers exist"""
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                open_new = len(self._pool_connections) < self.max_workers
+                if open_new:
+                    # Reserve the slot so concurrent callers don't overshoot; the login happens outside the lock
+                    self._pool_connections.append(None)
+            if open_new:
+                try:
+                    connection = self._open_connection()
+                except Exception:
+                    with self._pool_lock:
+                        self._pool_connections.remove(None)
+                    raise
+                with self._pool_lock:
+                    self._pool_connections[self._pool_connections.index(None)] = connection
+            else:
+                connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def _run_pooled(self, method_name: str, *args):
+        """Run an extractor method on a connection taken from the pool (pyodbc connections are not shared across threads)"""
+        with self._acquire() as connection:
+            worker = copy.copy(self)
+            worker.connection = connection
+            return getattr(worker, method_name)(*args)
+
+    def _cursor(self, query: str = None):
+        """Return this connection's cursor, created on first use with arraysize FETCH_ARRAY_SIZE (pyodbc defaults to 1)"""
+        # Without MARS a connection serves one pending result set at a time: any cursor left with
+        # unread rows makes the next statement on another cursor fail with "Connection is busy",
+        # so every result is read to the end (fetchall() even for single-row queries) and an
+        # iter_* generator must be exhausted before the next query on the same connection.
+        # Passing the query gives that statement a cursor of its own: pyodbc only skips SQLPrepare
+        # when a cursor re-executes the text it ran last, so the parameterized per-table getters
+        # keep their prepared handle across calls instead of alternating on the shared cursor
+        key = (self.connection, query)
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            cursor = self.connection.cursor()
+            cursor.arraysize = FETCH_ARRAY_SIZE
+            self._cursors[key] = cursor
+        return cursor
+
+    def iter_tables(self) -> Iterator[Dict[str, str]]:
+        """Yield all tables with schema"""
         query = """
         SELECT
             s.name AS schema_name,
@@ -43,147 +222,122 @@ class SqlServerMetadataExtractor:
         FROM sys.tables t
         INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
         WHERE t.is_ms_shipped = 0
-        ORDER BY s.name, t.name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query)
 
-        tables = []
-        for row in cursor.fetchall():
-            tables.append({
-                'schema': row.schema_name,
-                'table': row.table_name,
-                'object_id': row.object_id,
-                'full_name': f'{row.schema_name}.{row.table_name}'
-            })
+        table_values = _row_getter(cursor, ('schema_name', 'table_name', 'object_id'))
+        for row in _fetch_rows(cursor):
+            schema, table, object_id = table_values(row)
+            yield {
+                'schema': schema,
+                'table': table,
+                'object_id': object_id,
+                'full_name': f'{schema}.{table}'
+            }
 
-        cursor.close()
-        return tables
+    def get_tables_list(self) -> List[Dict[str, str]]:
+        """Get list of all tables with schema"""
+        return sorted(self.iter_tables(), key=_by_name('schema', 'table'))
 
-    def get_table_ddl(self, schema: str, table: str) -> str:
-        """Generate CREATE TABLE DDL for a specific table"""
+    def get_table_ddl(self, schema: str, table: str, columns: List[Dict[str, Any]] = None) -> str:
+        """Generate CREATE TABLE DDL for a specific table (columns are fetched if not supplied)"""
         ddl_parts = []
         ddl_parts.append(f"-- Table: {schema}.{table}")
         ddl_parts.append(f"CREATE TABLE [{schema}].[{table}] (")
 
         # Get columns
-        columns = self._get_columns(schema, table)
+        if columns is None:
+            columns = self._get_columns(schema, table)
         column_defs = []
 
         for col in columns:
-            col_def = f"    [{col['name']}] {col['type']}"
-
-            if col['max_length'] and col['type_name'] in ('varchar', 'char', 'nvarchar', 'nchar', 'varbinary', 'binary'):
-                if col['max_length'] == -1:
-                    col_def += "(MAX)"
-                elif col['type_name'].startswith('n'):
-                    col_def += f"({col['max_length']//2})"
-                else:
-                    col_def += f"({col['max_length']})"
-
-            if col['precision'] and col['type_name'] in ('decimal', 'numeric'):
-                col_def += f"({col['precision']},{col['scale']})"
+            parts = ["    [", col['name'], "] ", col['type']]
 
             if not col['is_nullable']:
-                col_def += " NOT NULL"
+                parts.append(" NOT NULL")
 
             if col['is_identity']:
-                col_def += f" IDENTITY({col['seed_value']},{col['increment_value']})"
+                parts.append(f" IDENTITY({col['seed_value']},{col['increment_value']})")
 
             if col['default_definition']:
-                col_def += f" DEFAULT {col['default_definition']}"
+                parts.append(" DEFAULT ")
+                parts.append(col['default_definition'])
 
-            column_defs.append(col_def)
+            column_defs.append(''.join(parts))
 
         ddl_parts.append(",\n".join(column_defs))
         ddl_parts.append(");")
 
         return "\n".join(ddl_parts)
 
+    @_per_table_cache
     def _get_columns(self, schema: str, table: str) -> List[Dict[str, Any]]:
         """Get column information for a table"""
-        # First get column info without the problematic default_definition
         query = """
         SELECT
             c.name,
             t.name AS type_name,
-            CASE
-                WHEN t.name IN ('varchar', 'char', 'varbinary', 'binary', 'nvarchar', 'nchar')
-                THEN CONCAT(t.name,
-                    CASE
-                        WHEN c.max_length = -1 THEN '(MAX)'
-                        WHEN t.name LIKE 'n%' THEN CONCAT('(', c.max_length/2, ')')
-                        ELSE CONCAT('(', c.max_length, ')')
-                    END)
-                WHEN t.name IN ('decimal', 'numeric')
-                THEN CONCAT(t.name, '(', c.precision, ',', c.scale, ')')
-                ELSE t.name
-            END AS type,
             c.max_length,
             c.precision,
             c.scale,
             c.is_nullable,
             c.is_identity,
-            CAST(ISNULL(ic.seed_value, 0) AS BIGINT) AS seed_value,
-            CAST(ISNULL(ic.increment_value, 0) AS BIGINT) AS increment_value,
+            CASE WHEN c.is_identity = 1
+                THEN CAST(IDENT_SEED(QUOTENAME(s.name) + '.' + QUOTENAME(tb.name)) AS BIGINT) ELSE 0 END AS seed_value,
+            CASE WHEN c.is_identity = 1
+                THEN CAST(IDENT_INCR(QUOTENAME(s.name) + '.' + QUOTENAME(tb.name)) AS BIGINT) ELSE 0 END AS increment_value,
             c.column_id,
-            c.default_object_id
+            dc.definition AS default_definition
         FROM sys.columns c
         INNER JOIN sys.types t ON c.user_type_id = t.user_type_id
         INNER JOIN sys.tables tb ON c.object_id = tb.object_id
         INNER JOIN sys.schemas s ON tb.schema_id = s.schema_id
-        LEFT JOIN sys.identity_columns ic ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+        LEFT JOIN sys.default_constraints dc ON dc.object_id = c.default_object_id
         WHERE s.name = ? AND tb.name = ?
         ORDER BY c.column_id
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor(query)
         cursor.execute(query, (schema, table))
 
+        column_values = _row_getter(cursor, COLUMN_QUERY_FIELDS)
         columns = []
-        for row in cursor.fetchall():
-            # Get default definition separately to avoid ODBC type issues
-            default_def = None
-            if row.default_object_id:
-                try:
-                    def_cursor = self.connection.cursor()
-                    def_cursor.execute(
-                        "SELECT OBJECT_DEFINITION(?) AS def_text",
-                        (row.default_object_id,)
-                    )
-                    def_row = def_cursor.fetchone()
-                    if def_row and def_row.def_text:
-                        default_def = def_row.def_text
-                    def_cursor.close()
-                except:
-                    pass  # Skip defaults that can't be retrieved
-
-            columns.append({
-                'name': row.name,
-                'type_name': row.type_name,
-                'type': row.type,
-                'max_length': row.max_length,
-                'precision': row.precision,
-                'scale': row.scale,
-                'is_nullable': row.is_nullable,
-                'is_identity': row.is_identity,
-                'seed_value': row.seed_value,
-                'increment_value': row.increment_value,
-                'default_definition': default_def,
-                'ordinal_position': row.column_id
-            })
+        for row in _fetch_rows(cursor):
+            columns.append(self._column_from_values(column_values(row)))
 
-        cursor.close()
         return columns
 
+    def _column_from_values(self, values: Tuple) -> Dict[str, Any]:
+        """Build a column dict from a _get_columns/_get_all_columns row's COLUMN_QUERY_FIELDS values"""
+        (name, type_name, max_length, precision, scale, is_nullable, is_identity,
+         seed_value, increment_value, default_definition, column_id) = values
+        # pyodbc returns a fresh str per cell; interning the type name keeps one copy per distinct type
+        type_name = sys.intern(type_name)
+        return {
+            'name': name,
+            'type_name': type_name,
+            'type': _format_type(type_name, max_length, precision, scale),
+            'max_length': max_length,
+            'precision': precision,
+            'scale': scale,
+            'is_nullable': is_nullable,
+            'is_identity': is_identity,
+            'seed_value': seed_value,
+            'increment_value': increment_value,
+            'default_definition': default_definition,
+            'ordinal_position': column_id
+        }
+
+    @_per_table_cache
     def get_primary_key(self, schema: str, table: str) -> Dict[str, Any]:
         """Get primary key information"""
         query = """
         SELECT
             kc.name AS constraint_name,
             i.type_desc AS index_type,
-            STRING_AGG(c.name, ',') WITHIN GROUP (ORDER BY ic.key_ordinal) AS columns
+            '[' + STRING_AGG('"' + STRING_ESCAPE(c.name, 'json') + '"', ',') WITHIN GROUP (ORDER BY ic.key_ordinal) + ']' AS columns
         FROM sys.key_constraints kc
         INNER JOIN sys.indexes i ON kc.parent_object_id = i.object_id AND kc.unique_index_id = i.index_id
         INNER JOIN sys.index_columns ic ON i.object_id = ic.object_id AND i.index_id = ic.index_id
@@ -194,19 +348,20 @@ class SqlServerMetadataExtractor:
         GROUP BY kc.name, i.type_desc
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor(query)
         cursor.execute(query, (schema, table))
-        row = cursor.fetchone()
-        cursor.close()
+        rows = cursor.fetchall()
+        row = rows[0] if rows else None
 
         if row:
             return {
                 'name': row.constraint_name,
                 'type': row.index_type,
-                'columns': row.columns.split(',')
+                'columns': json.loads(row.columns)
             }
         return None
 
+    @_per_table_cache
     def get_indexes(self, schema: str, table: str) -> List[Dict[str, Any]]:
         """Get all indexes for a table"""
         query = """
@@ -214,10 +369,10 @@ class SqlServerMetadataExtractor:
             i.name AS index_name,
             i.type_desc AS index_type,
             i.is_unique,
-            STRING_AGG(
-                c.name + CASE WHEN ic.is_descending_key = 1 THEN ' DESC' ELSE ' ASC' END,
+            '[' + STRING_AGG(
+                '"' + STRING_ESCAPE(c.name + CASE WHEN ic.is_descending_key = 1 THEN ' DESC' ELSE ' ASC' END, 'json') + '"',
                 ','
-            ) WITHIN GROUP (ORDER BY ic.key_ordinal) AS columns,
+            ) WITHIN GROUP (ORDER BY ic.key_ordinal) + ']' AS columns,
             i.filter_definition
         FROM sys.indexes i
         INNER JOIN sys.index_columns ic ON i.object_id = ic.object_id AND i.index_id = ic.index_id
@@ -226,25 +381,27 @@ class SqlServerMetadataExtractor:
         INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
         WHERE s.name = ? AND t.name = ? AND i.is_primary_key = 0 AND i.type > 0
         GROUP BY i.name, i.type_desc, i.is_unique, i.filter_definition
-        ORDER BY i.name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor(query)
         cursor.execute(query, (schema, table))
 
+        index_values = _row_getter(cursor, ('index_name', 'index_type', 'is_unique', 'columns', 'filter_definition'))
         indexes = []
-        for row in cursor.fetchall():
+        for row in _fetch_rows(cursor):
+            name, index_type, is_unique, index_columns, filter_definition = index_values(row)
             indexes.append({
-                'name': row.index_name,
-                'type': row.index_type,
-                'is_unique': row.is_unique,
-                'columns': row.columns.split(','),
-                'filter': row.filter_definition
+                'name': name,
+                'type': index_type,
+                'is_unique': is_unique,
+                'columns': json.loads(index_columns),
+                'filter': filter_definition
             })
 
-        cursor.close()
+        indexes.sort(key=_by_name('name'))
         return indexes
 
+    @_per_table_cache
     def get_foreign_keys(self, schema: str, table: str) -> List[Dict[str, Any]]:
         """Get foreign key constraints"""
         query = """
@@ -252,8 +409,8 @@ class SqlServerMetadataExtractor:
             fk.name AS constraint_name,
             OBJECT_SCHEMA_NAME(fk.referenced_object_id) AS ref_schema,
             OBJECT_NAME(fk.referenced_object_id) AS ref_table,
-            STRING_AGG(c.name, ',') WITHIN GROUP (ORDER BY fkc.constraint_column_id) AS columns,
-            STRING_AGG(rc.name, ',') WITHIN GROUP (ORDER BY fkc.constraint_column_id) AS ref_columns,
+            '[' + STRING_AGG('"' + STRING_ESCAPE(c.name, 'json') + '"', ',') WITHIN GROUP (ORDER BY fkc.constraint_column_id) + ']' AS columns,
+            '[' + STRING_AGG('"' + STRING_ESCAPE(rc.name, 'json') + '"', ',') WITHIN GROUP (ORDER BY fkc.constraint_column_id) + ']' AS ref_columns,
             fk.delete_referential_action_desc,
             fk.update_referential_action_desc
         FROM sys.foreign_keys fk
@@ -266,26 +423,188 @@ class SqlServerMetadataExtractor:
         GROUP BY fk.name, fk.referenced_object_id, fk.delete_referential_action_desc, fk.update_referential_action_desc
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor(query)
         cursor.execute(query, (schema, table))
 
+        fk_values = _row_getter(cursor, ('constraint_name', 'ref_schema', 'ref_table', 'columns', 'ref_columns', 'delete_referential_action_desc', 'update_referential_action_desc'))
         foreign_keys = []
-        for row in cursor.fetchall():
+        for row in _fetch_rows(cursor):
+            name, ref_schema, ref_table, fk_columns, ref_columns, on_delete, on_update = fk_values(row)
             foreign_keys.append({
-                'name': row.constraint_name,
-                'ref_schema': row.ref_schema,
-                'ref_table': row.ref_table,
-                'columns': row.columns.split(','),
-                'ref_columns': row.ref_columns.split(','),
-                'on_delete': row.delete_referential_action_desc,
-                'on_update': row.update_referential_action_desc
+                'name': name,
+                'ref_schema': ref_schema,
+                'ref_table': ref_table,
+                'columns': json.loads(fk_columns),
+                'ref_columns': json.loads(ref_columns),
+                'on_delete': on_delete,
+                'on_update': on_update
             })
 
-        cursor.close()
         return foreign_keys
 
-    def get_views(self) -> List[Dict[str, str]]:
-        """Get all views and their definitions"""
+    def _get_all_columns(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get column information for every user table, keyed by (schema, table)"""
+        query = """
+        SELECT
+            s.name AS schema_name,
+            tb.name AS table_name,
+            c.name,
+            t.name AS type_name,
+            c.max_length,
+            c.precision,
+            c.scale,
+            c.is_nullable,
+            c.is_identity,
+            CASE WHEN c.is_identity = 1
+                THEN CAST(IDENT_SEED(QUOTENAME(s.name) + '.' + QUOTENAME(tb.name)) AS BIGINT) ELSE 0 END AS seed_value,
+            CASE WHEN c.is_identity = 1
+                THEN CAST(IDENT_INCR(QUOTENAME(s.name) + '.' + QUOTENAME(tb.name)) AS BIGINT) ELSE 0 END AS increment_value,
+            c.column_id,
+            dc.definition AS default_definition
+        FROM sys.columns c
+        INNER JOIN sys.types t ON c.user_type_id = t.user_type_id
+        INNER JOIN sys.tables tb ON c.object_id = tb.object_id
+        INNER JOIN sys.schemas s ON tb.schema_id = s.schema_id
+        LEFT JOIN sys.default_constraints dc ON dc.object_id = c.default_object_id
+        WHERE tb.is_ms_shipped = 0
+        ORDER BY c.object_id, c.column_id
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query)
+
+        table_key = _row_getter(cursor, ('schema_name', 'table_name'))
+        column_values = _row_getter(cursor, COLUMN_QUERY_FIELDS)
+        columns = defaultdict(list)
+        for row in _fetch_rows(cursor):
+            columns[table_key(row)].append(self._column_from_values(column_values(row)))
+
+        return columns
+
+    def _get_all_pks(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Get primary key information for every user table, keyed by (schema, table)"""
+        query = """
+        SELECT
+            s.name AS schema_name,
+            t.name AS table_name,
+            kc.name AS constraint_name,
+            i.type_desc AS index_type,
+            '[' + STRING_AGG('"' + STRING_ESCAPE(c.name, 'json') + '"', ',') WITHIN GROUP (ORDER BY ic.key_ordinal) + ']' AS columns
+        FROM sys.key_constraints kc
+        INNER JOIN sys.indexes i ON kc.parent_object_id = i.object_id AND kc.unique_index_id = i.index_id
+        INNER JOIN sys.index_columns ic ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+        INNER JOIN sys.columns c ON ic.object_id = c.object_id AND ic.column_id = c.column_id
+        INNER JOIN sys.tables t ON kc.parent_object_id = t.object_id
+        INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
+        WHERE kc.type = 'PK' AND t.is_ms_shipped = 0
+        GROUP BY s.name, t.name, kc.name, i.type_desc
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query)
+
+        table_key = _row_getter(cursor, ('schema_name', 'table_name'))
+        pk_values = _row_getter(cursor, ('constraint_name', 'index_type', 'columns'))
+        primary_keys = {}
+        for row in _fetch_rows(cursor):
+            name, index_type, pk_columns = pk_values(row)
+            primary_keys[table_key(row)] = {
+                'name': name,
+                'type': index_type,
+                'columns': json.loads(pk_columns)
+            }
+
+        return primary_keys
+
+    def _get_all_indexes(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get all non-primary-key indexes of user tables, keyed by (schema, table)"""
+        query = """
+        SELECT
+            s.name AS schema_name,
+            t.name AS table_name,
+            i.name AS index_name,
+            i.type_desc AS index_type,
+            i.is_unique,
+            '[' + STRING_AGG(
+                '"' + STRING_ESCAPE(c.name + CASE WHEN ic.is_descending_key = 1 THEN ' DESC' ELSE ' ASC' END, 'json') + '"',
+                ','
+            ) WITHIN GROUP (ORDER BY ic.key_ordinal) + ']' AS columns,
+            i.filter_definition
+        FROM sys.indexes i
+        INNER JOIN sys.index_columns ic ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+        INNER JOIN sys.columns c ON ic.object_id = c.object_id AND ic.column_id = c.column_id
+        INNER JOIN sys.tables t ON i.object_id = t.object_id
+        INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
+        WHERE i.is_primary_key = 0 AND i.type > 0 AND t.is_ms_shipped = 0
+        GROUP BY s.name, t.name, i.name, i.type_desc, i.is_unique, i.filter_definition
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query)
+
+        table_key = _row_getter(cursor, ('schema_name', 'table_name'))
+        index_values = _row_getter(cursor, ('index_name', 'index_type', 'is_unique', 'columns', 'filter_definition'))
+        indexes = defaultdict(list)
+        for row in _fetch_rows(cursor):
+            name, index_type, is_unique, index_columns, filter_definition = index_values(row)
+            indexes[table_key(row)].append({
+                'name': name,
+                'type': index_type,
+                'is_unique': is_unique,
+                'columns': json.loads(index_columns),
+                'filter': filter_definition
+            })
+
+        for table_indexes in indexes.values():
+            table_indexes.sort(key=_by_name('name'))
+        return indexes
+
+    def _get_all_fks(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Get foreign key constraints of user tables, keyed by (schema, table)"""
+        query = """
+        SELECT
+            s.name AS schema_name,
+            t.name AS table_name,
+            fk.name AS constraint_name,
+            OBJECT_SCHEMA_NAME(fk.referenced_object_id) AS ref_schema,
+            OBJECT_NAME(fk.referenced_object_id) AS ref_table,
+            '[' + STRING_AGG('"' + STRING_ESCAPE(c.name, 'json') + '"', ',') WITHIN GROUP (ORDER BY fkc.constraint_column_id) + ']' AS columns,
+            '[' + STRING_AGG('"' + STRING_ESCAPE(rc.name, 'json') + '"', ',') WITHIN GROUP (ORDER BY fkc.constraint_column_id) + ']' AS ref_columns,
+            fk.delete_referential_action_desc,
+            fk.update_referential_action_desc
+        FROM sys.foreign_keys fk
+        INNER JOIN sys.foreign_key_columns fkc ON fk.object_id = fkc.constraint_object_id
+        INNER JOIN sys.columns c ON fkc.parent_object_id = c.object_id AND fkc.parent_column_id = c.column_id
+        INNER JOIN sys.columns rc ON fkc.referenced_object_id = rc.object_id AND fkc.referenced_column_id = rc.column_id
+        INNER JOIN sys.tables t ON fk.parent_object_id = t.object_id
+        INNER JOIN sys.schemas s ON t.schema_id = s.schema_id
+        WHERE t.is_ms_shipped = 0
+        GROUP BY s.name, t.name, fk.name, fk.referenced_object_id, fk.delete_referential_action_desc,
+            fk.update_referential_action_desc
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query)
+
+        table_key = _row_getter(cursor, ('schema_name', 'table_name'))
+        fk_values = _row_getter(cursor, ('constraint_name', 'ref_schema', 'ref_table', 'columns', 'ref_columns', 'delete_referential_action_desc', 'update_referential_action_desc'))
+        foreign_keys = defaultdict(list)
+        for row in _fetch_rows(cursor):
+            name, ref_schema, ref_table, fk_columns, ref_columns, on_delete, on_update = fk_values(row)
+            foreign_keys[table_key(row)].append({
+                'name': name,
+                'ref_schema': ref_schema,
+                'ref_table': ref_table,
+                'columns': json.loads(fk_columns),
+                'ref_columns': json.loads(ref_columns),
+                'on_delete': on_delete,
+                'on_update': on_update
+            })
+
+        return foreign_keys
+
+    def iter_views(self) -> Iterator[Dict[str, str]]:
+        """Yield all views and their definitions"""
         query = """
         SELECT
             s.name AS schema_name,
@@ -295,26 +614,27 @@ class SqlServerMetadataExtractor:
         INNER JOIN sys.schemas s ON v.schema_id = s.schema_id
         INNER JOIN sys.sql_modules m ON v.object_id = m.object_id
         WHERE v.is_ms_shipped = 0
-        ORDER BY s.name, v.name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query)
 
-        views = []
-        for row in cursor.fetchall():
-            views.append({
-                'schema': row.schema_name,
-                'name': row.view_name,
-                'definition': row.definition,
-                'full_name': f'{row.schema_name}.{row.view_name}'
-            })
+        module_values = _row_getter(cursor, ('schema_name', 'view_name', 'definition'))
+        for row in _fetch_rows(cursor):
+            schema, name, definition = module_values(row)
+            yield {
+                'schema': schema,
+                'name': name,
+                'definition': definition,
+                'full_name': f'{schema}.{name}'
+            }
 
-        cursor.close()
-        return views
+    def get_views(self) -> List[Dict[str, str]]:
+        """Get all views and their definitions"""
+        return sorted(self.iter_views(), key=_by_name('schema', 'name'))
 
-    def get_stored_procedures(self) -> List[Dict[str, str]]:
-        """Get all stored procedures"""
+    def iter_stored_procedures(self) -> Iterator[Dict[str, str]]:
+        """Yield all stored procedures"""
         query = """
         SELECT
             s.name AS schema_name,
@@ -324,26 +644,27 @@ class SqlServerMetadataExtractor:
         INNER JOIN sys.schemas s ON p.schema_id = s.schema_id
         INNER JOIN sys.sql_modules m ON p.object_id = m.object_id
         WHERE p.is_ms_shipped = 0
-        ORDER BY s.name, p.name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query)
 
-        procedures = []
-        for row in cursor.fetchall():
-            procedures.append({
-                'schema': row.schema_name,
-                'name': row.procedure_name,
-                'definition': row.definition,
-                'full_name': f'{row.schema_name}.{row.procedure_name}'
-            })
+        module_values = _row_getter(cursor, ('schema_name', 'procedure_name', 'definition'))
+        for row in _fetch_rows(cursor):
+            schema, name, definition = module_values(row)
+            yield {
+                'schema': schema,
+                'name': name,
+                'definition': definition,
+                'full_name': f'{schema}.{name}'
+            }
 
-        cursor.close()
-        return procedures
+    def get_stored_procedures(self) -> List[Dict[str, str]]:
+        """Get all stored procedures"""
+        return sorted(self.iter_stored_procedures(), key=_by_name('schema', 'name'))
 
-    def get_functions(self) -> List[Dict[str, str]]:
-        """Get all user-defined functions"""
+    def iter_functions(self) -> Iterator[Dict[str, str]]:
+        """Yield all user-defined functions"""
         query = """
         SELECT
             s.name AS schema_name,
@@ -354,27 +675,68 @@ class SqlServerMetadataExtractor:
         INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
         INNER JOIN sys.sql_modules m ON o.object_id = m.object_id
         WHERE o.type IN ('FN', 'IF', 'TF') AND o.is_ms_shipped = 0
-        ORDER BY s.name, o.name
         """
 
-        cursor = self.connection.cursor()
+        cursor = self._cursor()
         cursor.execute(query)
 
-        functions = []
-        for row in cursor.fetchall():
-            functions.append({
-                'schema': row.schema_name,
-                'name': row.function_name,
-                'type': row.type_desc,
-                'definition': row.definition,
-                'full_name': f'{row.schema_name}.{row.function_name}'
-            })
+        function_values = _row_getter(cursor, ('schema_name', 'function_name', 'type_desc', 'definition'))
+        for row in _fetch_rows(cursor):
+            schema, name, type_desc, definition = function_values(row)
+            yield {
+                'schema': schema,
+                'name': name,
+                'type': type_desc,
+                'definition': definition,
+                'full_name': f'{schema}.{name}'
+            }
 
-        cursor.close()
-        return functions
+    def get_functions(self) -> List[Dict[str, str]]:
+        """Get all user-defined functions"""
+        return sorted(self.iter_functions(), key=_by_name('schema', 'name'))
+
+    def _get_schema_fingerprint(self) -> str:
+        """Cheap fingerprint of the database's DDL state: user object count, latest modify_date and an id/date checksum"""
+        # modify_date moves on ALTER and on index changes; the checksum catches a drop and re-create within one tick
+        query = """
+        SELECT
+            COUNT(*),
+            CONVERT(varchar(27), MAX(modify_date), 121),
+            CHECKSUM_AGG(CHECKSUM(object_id, modify_date))
+        FROM sys.objects
+        WHERE is_ms_shipped = 0
+        """
+
+        cursor = self._cursor()
+        cursor.execute(query)
+        row = cursor.fetchall()[0]
+        return f'{row[0]}:{row[1]}:{row[2]}'
+
+    def _login(self) -> str:
+        """Identity the catalog is read as; Windows auth connects as the OS user"""
+        if self.auth_type == 'windows':
+            return f'windows:{getpass.getuser()}'
+        return f'sql:{self.username}'
+
+    def extract_complete_metadata(self, sections: Iterable[str] = METADATA_SECTIONS) -> Dict[str, Any]:
+        """Extract metadata from the database; sections not requested are left empty without being queried"""
+        sections = set(sections)
+        unknown = sections.difference(METADATA_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown metadata sections: {', '.join(sorted(unknown))}")
+
+        # Reuse a cached extraction while the catalog is unchanged
+        cache_file = None
+        if self.cache_dir:
+            cache_file = metadata_cache.cache_path(
+                self.cache_dir, 'sqlserver', self.server, self.port, self.database, self._login(),
+                ','.join(sorted(sections)), self._get_schema_fingerprint()
+            )
+            metadata = metadata_cache.load(cache_file)
+            if metadata is not None:
+                print(f"Using cached metadata: {cache_file}")
+                return metadata
 
-    def extract_complete_metadata(self) -> Dict[str, Any]:
-        """Extract all metadata from the database"""
         metadata = {
             'database': self.database,
             'server': self.server,
@@ -384,28 +746,57 @@ class SqlServerMetadataExtractor:
             'functions': []
         }
 
-        # Get tables with full details
-        tables = self.get_tables_list()
-        for table in tables:
-            table_meta = {
-                'schema': table['schema'],
-                'name': table['table'],
-                'full_name': table['full_name'],
-                'ddl': self.get_table_ddl(table['schema'], table['table']),
-                'columns': self._get_columns(table['schema'], table['table']),
-                'primary_key': self.get_primary_key(table['schema'], table['table']),
-                'indexes': self.get_indexes(table['schema'], table['table']),
-                'foreign_keys': self.get_foreign_keys(table['schema'], table['table'])
+        # The catalog queries are independent, so run them concurrently on pooled connections.
+        # Columns, keys, indexes and foreign keys are fetched for all tables in one query each
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            if 'tables' in sections:
+                tables_future = executor.submit(self._run_pooled, 'get_tables_list')
+                columns_future = executor.submit(self._run_pooled, '_get_all_columns')
+                primary_keys_future = executor.submit(self._run_pooled, '_get_all_pks')
+                indexes_future = executor.submit(self._run_pooled, '_get_all_indexes')
+                foreign_keys_future = executor.submit(self._run_pooled, '_get_all_fks')
+            # views, stored_procedures and functions are each loaded by the matching get_<section>()
+            section_futures = {
+                section: executor.submit(self._run_pooled, f'get_{section}')
+                for section in METADATA_SECTIONS if section != 'tables' and section in sections
             }
-            metadata['tables'].append(table_meta)
-
-        # Get views
-        metadata['views'] = self.get_views()
-
-        # Get stored procedures
-        metadata['stored_procedures'] = self.get_stored_procedures()
 
-        # Get functions
-        metadata['functions'] = self.get_functions()
+            if 'tables' in sections:
+                # Build the table entries and render their DDL as soon as the table list and columns
+                # are in, while the key, index and foreign key queries may still be running
+                columns = columns_future.result()
+                for table in tables_future.result():
+                    table_columns = columns.get((table['schema'], table['table']), [])
+                    metadata['tables'].append({
+                        'schema': table['schema'],
+                        'name': table['table'],
+                        'full_name': table['full_name'],
+                        'ddl': self.get_table_ddl(table['schema'], table['table'], table_columns),
+                        'columns': table_columns,
+                        'primary_key': None,
+                        'indexes': [],
+                        'foreign_keys': []
+                    })
+
+                primary_keys = primary_keys_future.result()
+                indexes = indexes_future.result()
+                foreign_keys = foreign_keys_future.result()
+                for table_meta in metadata['tables']:
+                    key = (table_meta['schema'], table_meta['name'])
+                    table_meta['primary_key'] = primary_keys.get(key)
+                    table_meta['indexes'] = indexes.get(key, [])
+                    table_meta['foreign_keys'] = foreign_keys.get(key, [])
+
+                    # Later per-table calls (e.g. get_table_ddl without columns) are answered from the bulk results
+                    self._table_cache[('_get_columns',) + key] = table_meta['columns']
+                    self._table_cache[('get_primary_key',) + key] = table_meta['primary_key']
+                    self._table_cache[('get_indexes',) + key] = table_meta['indexes']
+                    self._table_cache[('get_foreign_keys',) + key] = table_meta['foreign_keys']
+
+            for section, future in section_futures.items():
+                metadata[section] = future.result()
+
+        if cache_file:
+            metadata_cache.store(cache_file, metadata)
 
         return metadata